@@ -0,0 +1,33 @@
+import os
+
+MODEL_SIZES = {"tiny": 75, "base": 145, "small": 470, "medium": 1450, "large": 3000}
+MODEL_PRIORITY = ["large", "medium", "small", "base", "tiny"]
+MEDIA_EXTS = (".mp4", ".mkv", ".avi", ".mov")
+# Voice-detection settings for capit.vad, kept here so the GUI can read them
+# without importing numpy.
+# energy_db: frames quieter than this (dBFS) are never speech
+# modulation_db: spread of frame loudness over a second; speech rises and
+#   falls with every syllable while ambience and music beds stay level
+# min_pause: shorter gaps between speech are kept so words aren't clipped
+# pad: audio kept either side of each speech region
+VAD_DEFAULTS = {"energy_db": -45.0, "modulation_db": 4.0, "min_pause": 0.5, "pad": 0.2}
+
+
+def model_cache_dir():
+    return os.path.join(os.path.expanduser("~"), ".cache", "whisper")
+
+
+def model_path(model_name):
+    base_dir = model_cache_dir()
+    variations = [f"{model_name}.pt"]
+    if model_name == "large":
+        variations.extend(["large-v3.pt", "large-v2.pt", "large-v1.pt"])
+    for v in variations:
+        full_path = os.path.join(base_dir, v)
+        if os.path.exists(full_path):
+            return full_path
+    return os.path.join(base_dir, f"{model_name}.pt")
+
+
+def installed_models():
+    return [m for m in MODEL_PRIORITY if os.path.exists(model_path(m))]
@@ -0,0 +1,100 @@
+import threading
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+CHUNK_SECONDS = 30
+_SCALE = np.float32(1 / 32768)
+STDERR_LIMIT = 64 * 1024
+
+
+def _open_stream(media_path, start=None, duration=None):
+    import ffmpeg
+    in_args = {"ss": start} if start else {}
+    out_args = {"t": duration} if duration else {}
+    stream = ffmpeg.input(media_path, **in_args).output("pipe:", format="s16le", acodec="pcm_s16le", ac=1, ar=SAMPLE_RATE, **out_args)
+    proc = stream.global_args("-nostdin", "-loglevel", "error").run_async(pipe_stdout=True, pipe_stderr=True)
+    # Drain stderr alongside stdout: a chatty ffmpeg would otherwise fill the
+    # pipe and stall while we wait on stdout
+    proc.stderr_tail = bytearray()
+    proc.stderr_reader = threading.Thread(target=_drain_stderr, args=(proc,), daemon=True)
+    proc.stderr_reader.start()
+    return proc
+
+
+def _drain_stderr(proc):
+    # Keeps only the last STDERR_LIMIT bytes, which is where the error is
+    for line in iter(proc.stderr.readline, b""):
+        proc.stderr_tail += line
+        del proc.stderr_tail[:-STDERR_LIMIT]
+
+
+def _close_stream(proc, finished):
+    if not finished and proc.poll() is None:
+        proc.kill()
+    proc.stdout.close()
+    proc.stderr_reader.join()
+    proc.stderr.close()
+    err = proc.stderr_tail.decode(errors="replace").strip()
+    if proc.wait() != 0 and finished:
+        raise RuntimeError(f"ffmpeg failed to decode audio: {err}")
+
+
+def _read_pcm(proc, chunk_samples):
+    # Yields views into one int16 scratch buffer; callers must consume each
+    # chunk before asking for the next one
+    buf = np.empty(chunk_samples, dtype=np.int16)
+    view = memoryview(buf).cast("B")
+    while True:
+        filled = 0
+        while filled < len(view):
+            n = proc.stdout.readinto(view[filled:])
+            if not n: break
+            filled += n
+        if filled >= 2:
+            yield buf[:filled // 2]
+        if filled < len(view):
+            return
+
+
+def iter_audio_chunks(media_path, chunk_seconds=CHUNK_SECONDS, start=None, duration=None):
+    proc = _open_stream(media_path, start, duration)
+    finished = False
+    try:
+        for pcm in _read_pcm(proc, int(chunk_seconds * SAMPLE_RATE)):
+            yield pcm * _SCALE
+        finished = True
+    finally:
+        _close_stream(proc, finished)
+
+
+def load_audio(media_path, start=None, duration=None, expected_duration=None, out=None):
+    # Decode 16 kHz mono PCM from ffmpeg's stdout straight into one float32
+    # buffer. Sizing it from the probed duration avoids both the temp WAV and
+    # the bytes -> int16 -> float32 copies of a naive np.frombuffer decode.
+    expected = duration or expected_duration or 0
+    capacity = int(expected * SAMPLE_RATE) + SAMPLE_RATE
+    buf = out if out is not None and len(out) >= capacity else np.empty(capacity, dtype=np.float32)
+    n = 0
+    proc = _open_stream(media_path, start, duration)
+    finished = False
+    try:
+        for pcm in _read_pcm(proc, CHUNK_SECONDS * SAMPLE_RATE):
+            if n + len(pcm) > len(buf):
+                grown = np.empty(max(len(buf) * 3 // 2, n + len(pcm)), dtype=np.float32)
+                grown[:n] = buf[:n]
+                buf = grown
+            np.multiply(pcm, _SCALE, out=buf[n:n + len(pcm)], casting="unsafe")
+            n += len(pcm)
+        finished = True
+    finally:
+        _close_stream(proc, finished)
+    return buf[:n]
+
+
+def read_wav(wav_path):
+    # Fallback for audio extracted to a temporary 16 kHz mono s16le WAV
+    import wave
+    with wave.open(wav_path, "rb") as w:
+        pcm = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+    return pcm * _SCALE
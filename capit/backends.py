@@ -0,0 +1,198 @@
+import os
+import difflib
+import importlib.util
+
+from capit import model_path
+
+DEFAULT_BACKEND = os.environ.get("CAPIT_BACKEND", "whisper")
+
+
+def _torch_device():
+    try:
+        import torch
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    except ImportError:
+        return "cpu"
+
+
+class Backend:
+    # One way of running a model. Models returned by load() expose
+    # transcribe(audio, task=..., language=..., initial_prompt=..., **options)
+    # and return {"segments": [{"start", "end", "text"}], "language": ...}
+    # like openai-whisper does.
+    name = None
+    label = None
+    module = None
+    memory_factor = 1.0
+
+    def available(self):
+        return self.module is None or importlib.util.find_spec(self.module) is not None
+
+    def default_device(self):
+        return _torch_device()
+
+    def default_precision(self, device):
+        return "fp32"
+
+    def options(self, precision):
+        return {}
+
+    def load(self, name, device, precision):
+        raise NotImplementedError
+
+
+class WhisperBackend(Backend):
+    name = "whisper"
+    label = "Whisper (PyTorch)"
+    module = "whisper"
+
+    def default_precision(self, device):
+        return "fp16" if device.startswith("cuda") else "fp32"
+
+    def options(self, precision):
+        return {"fp16": precision == "fp16"}
+
+    def load(self, name, device, precision):
+        import whisper
+        path = model_path(name)
+        return whisper.load_model(path if os.path.exists(path) else name, device=device)
+
+
+class WhisperInt8Backend(WhisperBackend):
+    # The same checkpoints with every linear layer dynamically quantised to
+    # int8; CPU only
+    name = "whisper-int8"
+    label = "Whisper int8 (CPU)"
+    memory_factor = 0.4
+
+    def default_device(self):
+        return "cpu"
+
+    def default_precision(self, device):
+        return "int8"
+
+    def options(self, precision):
+        return {"fp16": False}
+
+    def load(self, name, device, precision):
+        import torch
+        import whisper.model
+        model = super().load(name, "cpu", "fp32")
+        # quantize_dynamic only swaps exact nn.Linear instances, and whisper
+        # uses its own dtype-casting subclass
+        for module in list(model.modules()):
+            for child_name, child in module.named_children():
+                if type(child) is whisper.model.Linear:
+                    plain = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+                    plain.load_state_dict(child.state_dict())
+                    setattr(module, child_name, plain)
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class _FasterWhisperModel:
+    def __init__(self, model):
+        self.model = model
+
+    def transcribe(self, audio, task="transcribe", language=None, initial_prompt=None, **options):
+        segments, info = self.model.transcribe(audio, task=task, language=language, initial_prompt=initial_prompt)
+        return {"segments": [{"start": s.start, "end": s.end, "text": s.text} for s in segments], "language": info.language}
+
+
+class FasterWhisperBackend(Backend):
+    # CTranslate2 engine; fetches its own converted weights on first use
+    name = "faster-whisper"
+    label = "faster-whisper (CTranslate2)"
+    module = "faster_whisper"
+    memory_factor = 0.35
+
+    def default_precision(self, device):
+        return "float16" if device.startswith("cuda") else "int8"
+
+    def load(self, name, device, precision):
+        from faster_whisper import WhisperModel
+        return _FasterWhisperModel(WhisperModel("large-v3" if name == "large" else name, device=device, compute_type=precision))
+
+
+class StubModel:
+    # Stands in for a Whisper model on machines without weights: one segment
+    # per 5 s of audio, so every stage around the model still runs for real
+
+    def transcribe(self, audio, task="translate", **options):
+        import numpy as np
+        from capit.audio import SAMPLE_RATE
+        step = 5 * SAMPLE_RATE
+        segs = []
+        for i in range(0, len(audio), step):
+            level = float(np.sqrt(np.mean(np.square(audio[i:i + step]))))
+            segs.append({"start": i / SAMPLE_RATE, "end": min(i + step, len(audio)) / SAMPLE_RATE, "text": f" {task} {level:.3f}"})
+        return {"segments": segs, "language": "en"}
+
+
+class StubBackend(Backend):
+    name = "stub"
+    label = "Stub (no weights)"
+    memory_factor = 0.0
+
+    def default_device(self):
+        return "cpu"
+
+    def load(self, name, device, precision):
+        return StubModel()
+
+
+BACKENDS = {b.name: b for b in (WhisperBackend(), WhisperInt8Backend(), FasterWhisperBackend(), StubBackend())}
+
+
+def get_backend(name=None):
+    try:
+        return BACKENDS[name or DEFAULT_BACKEND]
+    except KeyError:
+        raise ValueError(f"Unknown backend {name!r}; choose from {', '.join(BACKENDS)}.")
+
+
+def available_backends(include_stub=False):
+    return [b.name for b in BACKENDS.values() if b.available() and (include_stub or b.name != "stub")]
+
+
+def model_id(model_name, backend=None):
+    # Identifies a model's output for the cache and checkpoints; plain
+    # whisper keeps the bare name so existing entries stay valid
+    backend = backend or DEFAULT_BACKEND
+    return model_name if backend == "whisper" else f"{model_name}@{backend}"
+
+
+def word_drift(reference, hypothesis):
+    # Word-level edit rate of hypothesis against reference (WER-style)
+    ref, hyp = reference.lower().split(), hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    edits = 0
+    for op, i1, i2, j1, j2 in difflib.SequenceMatcher(None, ref, hyp, autojunk=False).get_opcodes():
+        if op != "equal":
+            edits += max(i2 - i1, j2 - j1)
+    return edits / len(ref)
+
+
+def compare_backends(media_path, model_name, backends, task="translate", report=print):
+    import time
+    from capit import engine
+    from capit.audio import load_audio
+    from capit.registry import registry
+
+    duration = engine.probe_duration(media_path)
+    audio = load_audio(media_path, expected_duration=duration)
+    rows = []
+    report(f"{'backend':<16} {'precision':<9} {'load s':>8} {'decode s':>9} {'RTF':>7} {'drift':>7}")
+    for backend in backends:
+        key = registry.key(model_name, backend=backend)
+        started = time.perf_counter()
+        model = registry.get(*key)
+        loaded = time.perf_counter() - started
+        started = time.perf_counter()
+        text = " ".join(seg["text"].strip() for segs, _, _, _ in engine.transcribe_spans(model, audio, task, **registry.options(key)) for seg in segs)
+        decoded = time.perf_counter() - started
+        drift = word_drift(rows[0]["text"], text) if rows else 0.0
+        rows.append({"backend": backend, "precision": key[2], "load": loaded, "decode": decoded, "rtf": decoded / duration, "drift": drift, "text": text})
+        report(f"{backend:<16} {key[2]:<9} {loaded:>8.1f} {decoded:>9.1f} {decoded / duration:>7.3f} {drift:>6.1%}")
+        registry.discard(model_name)
+    return rows
@@ -0,0 +1,108 @@
+import os
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from capit import MEDIA_EXTS, MODEL_PRIORITY
+from capit import engine
+from capit.checkpoint import has_checkpoint
+from capit.chunked import transcribe_chunked
+from capit.registry import init_worker
+
+
+def collect_media(targets):
+    files = []
+    for target in targets:
+        if os.path.isdir(target):
+            found = [os.path.join(target, f) for f in sorted(os.listdir(target)) if f.lower().endswith(MEDIA_EXTS)]
+        else:
+            found = sorted(glob.glob(target))
+        for f in found:
+            f = os.path.abspath(f)
+            if os.path.isfile(f) and f not in files:
+                files.append(f)
+    return files
+
+
+def is_up_to_date(media_path, task="translate"):
+    # "both" always writes <name>.en.srt; the original-language file needs the detected language
+    out_file = engine.srt_path(media_path) if task != "both" else os.path.splitext(media_path)[0] + ".en.srt"
+    if has_checkpoint(out_file):
+        return False
+    return os.path.exists(out_file) and os.path.getmtime(out_file) >= os.path.getmtime(media_path)
+
+
+def _run_one(media_path, model_name, task, temp_wav, use_cache, backend, vad):
+    return engine.transcribe_file(media_path, model_name, task, temp_wav=temp_wav, use_cache=use_cache, backend=backend, vad=vad)
+
+
+def _fmt_duration(seconds):
+    if seconds is None: return "-"
+    m, s = divmod(int(seconds), 60)
+    h, m = divmod(m, 60)
+    return f"{h}:{m:02d}:{s:02d}"
+
+
+def _collect(media_path, fetch, report):
+    try:
+        res = fetch()
+        res["status"] = "cached" if res.get("cached") else "done"
+        report(f"{res['status']:<8} {_fmt_duration(res['duration']):>8}  {_fmt_duration(res['elapsed']):>8}  {media_path}")
+    except Exception as e:
+        res = {"path": media_path, "status": "failed", "duration": None, "elapsed": 0.0, "error": str(e)}
+        report(f"failed   {'-':>8}  {'-':>8}  {media_path}: {e}")
+    return res
+
+
+def resolve_models(files, deadline, task="translate", backend=None, report=print):
+    # Picks a model per file from its duration, the deadline and the
+    # throughput measured on this machine
+    from capit.throughput import format_eta, stats
+    chosen = {}
+    for f in files:
+        try:
+            duration = engine.probe_duration(f)
+        except Exception:
+            # Unreadable media fails later with a proper error; any model will do
+            chosen[f] = stats.choose_model(0) or MODEL_PRIORITY[-1]
+            continue
+        model = stats.choose_model(duration, deadline, backend=backend, task=task)
+        if model is None:
+            raise RuntimeError("No installed models to choose from; download one first.")
+        chosen[f] = model
+        report(f"{model:<8} {_fmt_duration(duration):>8}  ~{format_eta(stats.estimate(model, duration, backend, task)):>8}  {f}")
+    return chosen
+
+
+def run_batch(files, model_name, task="translate", workers=1, force=False, budget_mb=None, temp_wav=False, chunking=None, use_cache=True, backend=None, deadline=None, vad=None, report=print):
+    # model_name "auto" chooses a model per file, see resolve_models
+    started = time.perf_counter()
+    results = []
+    pending = []
+    for f in files:
+        if not force and is_up_to_date(f, task):
+            results.append({"path": f, "status": "skipped", "duration": None, "elapsed": 0.0})
+            report(f"skipped  {'-':>8}  {'-':>8}  {f}")
+        else:
+            pending.append(f)
+    models = resolve_models(pending, deadline, task, backend, report) if model_name == "auto" else dict.fromkeys(pending, model_name)
+
+    if chunking is not None:
+        # Long-media mode: one file at a time, its windows spread over the workers
+        for f in pending:
+            results.append(_collect(f, lambda f=f: transcribe_chunked(f, models[f], task, workers=workers, budget_mb=budget_mb, backend=backend, **chunking), report))
+    else:
+        workers = max(1, workers)
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(threads, budget_mb)) as pool:
+            futures = {pool.submit(_run_one, f, models[f], task, temp_wav, use_cache, backend, vad): f for f in pending}
+            for fut in as_completed(futures):
+                results.append(_collect(futures[fut], fut.result, report))
+
+    wall = time.perf_counter() - started
+    media = sum(r["duration"] for r in results if r["status"] in ("done", "cached"))
+    counts = {s: sum(1 for r in results if r["status"] == s) for s in ("done", "cached", "skipped", "failed")}
+    throughput = (media / wall) if wall > 0 else 0.0
+    report(f"\n{counts['done']} done, {counts['cached']} from cache, {counts['skipped']} skipped, {counts['failed']} failed in {_fmt_duration(wall)}")
+    report(f"Throughput: {throughput:.2f} media-hours per wall-clock hour ({media / 3600:.2f} h of media)")
+    return results
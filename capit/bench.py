@@ -0,0 +1,227 @@
+import os
+import sys
+import json
+import time
+import wave
+import shutil
+import platform
+import tempfile
+import threading
+import importlib.util
+
+import numpy as np
+
+from capit import installed_models
+from capit import engine
+from capit.audio import SAMPLE_RATE, load_audio, read_wav
+from capit.backends import StubModel, model_id
+from capit.registry import registry
+
+DEFAULT_LENGTHS = [30, 120, 600]
+STAGES = ["extract", "load_model", "transcribe", "srt"]
+
+
+def _statm_rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _psutil_rss():
+    import psutil
+    return psutil.Process().memory_info().rss
+
+
+def _windows_rss():
+    import ctypes
+    from ctypes import wintypes
+
+    class Counters(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [(name, ctypes.c_size_t) for name in (
+            "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+            "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+    kernel32, psapi = ctypes.WinDLL("kernel32"), ctypes.WinDLL("psapi", use_last_error=True)
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(Counters), wintypes.DWORD]
+    counters = Counters(cb=ctypes.sizeof(Counters))
+    if not psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+        raise OSError(ctypes.get_last_error(), "GetProcessMemoryInfo failed")
+    return counters.WorkingSetSize
+
+
+def _maxrss():
+    # Last resort: the process's high-water mark so far rather than its
+    # current size, so a stage reports at least the peak of the ones before it
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+RSS_SOURCES = [_psutil_rss, _windows_rss, _statm_rss, _maxrss]
+_rss_source = []
+
+
+def _rss_bytes():
+    # The first source that works here is kept for every later sample
+    if not _rss_source:
+        for source in RSS_SOURCES:
+            try:
+                if source():
+                    _rss_source.append(source)
+                    break
+            except (ImportError, OSError, ValueError, AttributeError):
+                continue
+        else:
+            _rss_source.append(None)
+    try:
+        return _rss_source[0]() if _rss_source[0] else None
+    except (OSError, ValueError):
+        return None
+
+
+class PeakRss:
+    # Samples resident memory on a background thread while a stage runs
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = _rss_bytes()
+            if rss is not None: self.peak = max(self.peak or 0, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def measure(fn, duration):
+    with PeakRss() as rss:
+        started = time.perf_counter()
+        value = fn()
+        wall = time.perf_counter() - started
+    return value, {"wall": round(wall, 6), "rss_peak_mb": round(rss.peak / (1024 * 1024), 1) if rss.peak else None,
+                   "rtf": round(wall / duration, 6) if duration else None}
+
+
+def synth_speech(path, seconds, seed=0):
+    # Voiced harmonics with a syllable-rate envelope and pauses, plus noise
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    f0 = 140 + 30 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (np.sin(2 * np.pi * 0.1 * t) > -0.3)
+    signal = 0.3 * voice * envelope + 0.01 * rng.standard_normal(len(t))
+    pcm = (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(pcm.tobytes())
+    return path
+
+
+def build_corpus(lengths, workdir):
+    return [synth_speech(os.path.join(workdir, f"synthetic_{n:g}s.wav"), n, seed=int(n)) for n in lengths]
+
+
+def have_ffmpeg():
+    return shutil.which("ffmpeg") is not None and importlib.util.find_spec("ffmpeg") is not None
+
+
+def bench_one(media_path, model_name, stub=False, task="translate", backend=None):
+    ffmpeg_ok = have_ffmpeg()
+    duration = engine.probe_duration(media_path) if ffmpeg_ok else None
+    stages = {}
+    if ffmpeg_ok:
+        audio, stages["extract"] = measure(lambda: load_audio(media_path, expected_duration=duration), duration)
+    else:
+        # No ffmpeg on this box: read the synthetic WAV directly and leave extraction unmeasured
+        audio = read_wav(media_path)
+        stages["extract"] = None
+    duration = duration or len(audio) / SAMPLE_RATE
+
+    if stub:
+        model, stages["load_model"] = measure(StubModel, duration)
+        options = {}
+    else:
+        key = registry.key(model_name, backend=backend)
+        registry.discard(model_name)
+        model, stages["load_model"] = measure(lambda: registry.get(*key), duration)
+        options = registry.options(key)
+
+    def transcribe():
+        segs = []
+        for chunk, _, _, _ in engine.transcribe_spans(model, audio, task, **options):
+            segs.extend(chunk)
+        return segs
+    segments, stages["transcribe"] = measure(transcribe, duration)
+
+    fd, out_file = tempfile.mkstemp(suffix=".srt")
+    os.close(fd)
+    try:
+        _, stages["srt"] = measure(lambda: engine.write_srt(segments, out_file), duration)
+    finally:
+        os.remove(out_file)
+
+    total = sum(s["wall"] for s in stages.values() if s)
+    return {"model": "stub" if stub else model_id(model_name, backend), "media": os.path.basename(media_path), "duration": round(duration, 3),
+            "segments": len(segments), "stages": stages, "total": {"wall": round(total, 6), "rtf": round(total / duration, 6)}}
+
+
+def run_bench(corpus=None, lengths=DEFAULT_LENGTHS, models=None, stub=False, task="translate", backend=None, report=print):
+    workdir = None
+    if corpus:
+        files = sorted(os.path.join(corpus, f) for f in os.listdir(corpus))
+    else:
+        workdir = tempfile.mkdtemp(prefix="capit_bench_")
+        files = build_corpus(lengths, workdir)
+    models = ["stub"] if stub else (models or installed_models())
+    results = []
+    if _rss_bytes() is None:
+        report("Warning: resident memory can't be measured on this platform; peak memory is left out.")
+    try:
+        report(f"{'model':<20} {'media':<22} " + " ".join(f"{s:>12}" for s in STAGES) + f" {'RTF':>8}")
+        for m in models:
+            for f in files:
+                res = bench_one(f, m, stub=stub, task=task, backend=backend)
+                results.append(res)
+                cells = " ".join(f"{res['stages'][s]['wall']:>11.3f}s" if res["stages"][s] else f"{'-':>12}" for s in STAGES)
+                report(f"{res['model']:<20} {res['media'][:22]:<22} {cells} {res['total']['rtf']:>8.4f}")
+    finally:
+        if workdir: shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "meta": {"python": sys.version.split()[0], "platform": platform.platform(), "cpus": os.cpu_count(),
+                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "stub": stub, "task": task,
+                 "rss_source": _rss_source[0].__name__.strip("_") if _rss_source[0] else None},
+        "results": results,
+    }
+
+
+def compare(base, new, report=print):
+    # Ratios above 1.0 mean the new run is slower than the baseline
+    index = {(r["model"], r["media"]): r for r in base["results"]}
+    report(f"{'model':<20} {'media':<22} " + " ".join(f"{s:>12}" for s in STAGES + ["total"]))
+    for r in new["results"]:
+        old = index.get((r["model"], r["media"]))
+        if not old: continue
+        cells = []
+        for s in STAGES + ["total"]:
+            a = old["total"] if s == "total" else old["stages"].get(s)
+            b = r["total"] if s == "total" else r["stages"].get(s)
+            cells.append(f"{b['wall'] / a['wall']:>11.2f}x" if a and b and a["wall"] else f"{'-':>12}")
+        report(f"{r['model']:<20} {r['media'][:22]:<22} " + " ".join(cells))
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,98 @@
+import os
+import json
+import hashlib
+import threading
+
+CACHE_DIR = os.environ.get("CAPIT_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "capit", "transcripts")
+DEFAULT_MAX_MB = int(os.environ.get("CAPIT_CACHE_MAX_MB", "512"))
+STATS_FILE = "stats.json"
+
+
+def audio_fingerprint(audio):
+    # SHA-256 of the decoded PCM itself. Renamed or copied media decode to the
+    # same samples; anything short of identical audio gets its own entry.
+    import numpy as np
+    h = hashlib.sha256(str(len(audio)).encode())
+    h.update(memoryview(np.ascontiguousarray(audio, dtype=np.float32)).cast("B"))
+    return h.hexdigest()
+
+
+class TranscriptCache:
+    # On-disk store of raw segment lists keyed by audio fingerprint, model
+    # and task. Entries are evicted oldest-use first once the directory
+    # grows past max_mb.
+
+    def __init__(self, root=CACHE_DIR, max_mb=DEFAULT_MAX_MB):
+        self.root = root
+        self.max_bytes = max_mb * 1024 * 1024
+        self._lock = threading.Lock()
+
+    def _entry(self, fingerprint, model_name, task):
+        key = hashlib.sha256(f"{fingerprint}:{model_name}:{task}".encode()).hexdigest()
+        return os.path.join(self.root, f"{key}.json")
+
+    def _entries(self):
+        if not os.path.isdir(self.root): return []
+        return [e for e in os.scandir(self.root) if e.name.endswith(".json") and e.name != STATS_FILE]
+
+    def _bump(self, counter):
+        with self._lock:
+            stats = self._read_stats()
+            stats[counter] = stats.get(counter, 0) + 1
+            self._write_json(os.path.join(self.root, STATS_FILE), stats)
+
+    def _read_stats(self):
+        try:
+            with open(os.path.join(self.root, STATS_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"hits": 0, "misses": 0}
+
+    def _write_json(self, path, data):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def get(self, fingerprint, model_name, task):
+        path = self._entry(fingerprint, model_name, task)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self._bump("misses")
+            return None
+        self._bump("hits")
+        return data
+
+    def put(self, fingerprint, model_name, task, segments, language=None):
+        segments = [{"start": s["start"], "end": s["end"], "text": s["text"]} for s in segments]
+        self._write_json(self._entry(fingerprint, model_name, task), {"model": model_name, "task": task, "language": language, "segments": segments})
+        self.evict()
+
+    def evict(self):
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+        total = sum(e.stat().st_size for e in entries)
+        for e in entries:
+            if total <= self.max_bytes: break
+            total -= e.stat().st_size
+            try: os.remove(e.path)
+            except OSError: pass
+
+    def stats(self):
+        entries = self._entries()
+        stats = self._read_stats()
+        return {"entries": len(entries), "bytes": sum(e.stat().st_size for e in entries),
+                "hits": stats.get("hits", 0), "misses": stats.get("misses", 0)}
+
+    def clear(self):
+        for e in self._entries():
+            try: os.remove(e.path)
+            except OSError: pass
+        with self._lock:
+            self._write_json(os.path.join(self.root, STATS_FILE), {"hits": 0, "misses": 0})
+
+
+cache = TranscriptCache()
@@ -0,0 +1,52 @@
+import os
+import json
+
+
+def checkpoint_path(out_file):
+    return out_file + ".capit.json"
+
+
+class Checkpoint:
+    # Sidecar next to a partially written SRT. It remembers how far decoding
+    # got and how many bytes of the SRT are complete, so a restarted job for
+    # the same media, model and task can pick up where it stopped.
+
+    def __init__(self, out_file, media_path, model_name, task):
+        st = os.stat(media_path)
+        self.path = checkpoint_path(out_file)
+        self.key = {"media": os.path.abspath(media_path), "size": st.st_size, "mtime": st.st_mtime, "model": model_name, "task": task}
+        self.position = 0.0
+        self.cues = 0
+        self.srt_bytes = 0
+        self.prompt = None
+        self.language = None
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("key") != self.key:
+            return False
+        self.position = data["position"]
+        self.cues = data["cues"]
+        self.srt_bytes = data["srt_bytes"]
+        self.prompt = data.get("prompt")
+        self.language = data.get("language")
+        return True
+
+    def save(self):
+        data = {"key": self.key, "position": self.position, "cues": self.cues, "srt_bytes": self.srt_bytes,
+                "prompt": self.prompt, "language": self.language}
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path): os.remove(self.path)
+
+
+def has_checkpoint(out_file):
+    return os.path.exists(checkpoint_path(out_file))
@@ -0,0 +1,117 @@
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from capit import engine
+from capit.audio import load_audio
+from capit.registry import init_worker, registry
+
+DEFAULT_WINDOW = 600.0
+DEFAULT_OVERLAP = 15.0
+# Slack for the two sides of an overlap timing the same boundary differently
+CUT_TOLERANCE = 0.5
+DUPLICATE_RATIO = 0.6
+
+
+def plan_windows(duration, window=DEFAULT_WINDOW, overlap=DEFAULT_OVERLAP):
+    if window <= overlap:
+        raise ValueError("Window must be longer than the overlap.")
+    windows = []
+    start = 0.0
+    while True:
+        end = min(start + window, duration)
+        windows.append((start, end))
+        if end >= duration:
+            return windows
+        start = end - overlap
+
+
+def _transcribe_window(media_path, start, end, model_name, task, language, backend):
+    audio = load_audio(media_path, start=start, duration=end - start)
+    key = registry.key(model_name, backend=backend)
+    model = registry.get(*key)
+    result = model.transcribe(audio, task=task, language=language, **registry.options(key))
+    return [{"start": seg["start"] + start, "end": min(seg["end"] + start, end), "text": seg["text"]} for seg in result["segments"]]
+
+
+def _norm(text):
+    return " ".join(re.sub(r"[^\w\s]", "", text.lower()).split())
+
+
+def _is_duplicate(seg, prev, overlap):
+    # The same words decoded by both windows: one text holds the other, and
+    # the shorter is most of the longer
+    if seg["start"] > prev["end"] + overlap:
+        return False
+    a, b = _norm(seg["text"]).split(), _norm(prev["text"]).split()
+    if not a or not b:
+        return False
+    short, long = sorted((a, b), key=len)
+    return len(short) >= DUPLICATE_RATIO * len(long) and f" {' '.join(short)} " in f" {' '.join(long)} "
+
+
+def merge_windows(windows, results, overlap=DEFAULT_OVERLAP):
+    # Each window keeps every segment starting before the centre of its
+    # overlap with the next one. The next window then picks up from the first
+    # of its own segments starting at the end of what was kept, so words
+    # segmented differently on the two sides are neither lost nor doubled;
+    # repeats inside the overlap are dropped.
+    merged = []
+    cut = float("-inf")
+    for i, ((start, end), segs) in enumerate(zip(windows, results)):
+        hi = (windows[i + 1][0] + end) / 2 if i + 1 < len(windows) else float("inf")
+        for seg in segs:
+            if seg["start"] < cut - CUT_TOLERANCE or seg["start"] >= hi:
+                continue
+            in_overlap = i > 0 and start <= seg["start"] <= windows[i - 1][1]
+            if in_overlap and merged and _is_duplicate(seg, merged[-1], overlap):
+                continue
+            seg = dict(seg)
+            if merged and seg["start"] < merged[-1]["end"]:
+                seg["start"] = min(merged[-1]["end"], seg["end"])
+            merged.append(seg)
+        if merged: cut = merged[-1]["end"]
+    return merged
+
+
+def transcribe_chunked(media_path, model_name, task="translate", window=DEFAULT_WINDOW, overlap=DEFAULT_OVERLAP,
+                       workers=None, language=None, budget_mb=None, out_file=None, progress=None, backend=None):
+    if task == "both":
+        raise ValueError("Long-media mode supports translate or transcribe, not both.")
+    progress = progress or (lambda status, value: None)
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    progress("Extracting Audio...", 0.10)
+    total_duration = engine.probe_duration(media_path)
+    windows = plan_windows(total_duration, window, overlap)
+    threads = max(1, (os.cpu_count() or 1) // min(workers, len(windows)))
+    results = [None] * len(windows)
+    progress("AI Processing...", 0.25)
+    with ProcessPoolExecutor(max_workers=min(workers, len(windows)), initializer=init_worker, initargs=(threads, budget_mb)) as pool:
+        futures = {pool.submit(_transcribe_window, media_path, s, e, model_name, task, language, backend): i for i, (s, e) in enumerate(windows)}
+        for done, fut in enumerate(as_completed(futures), 1):
+            results[futures[fut]] = fut.result()
+            progress(None, 0.25 + 0.7 * done / len(windows))
+    segments = merge_windows(windows, results, overlap)
+    out_file = engine.write_srt(segments, out_file or engine.srt_path(media_path))
+    return {
+        "path": media_path,
+        "srt": out_file,
+        "duration": total_duration,
+        "elapsed": time.perf_counter() - started,
+        "segments": len(segments),
+        "windows": len(windows),
+    }
+
+
+def speedup_curve(media_path, model_name, worker_counts, task="translate", window=DEFAULT_WINDOW, overlap=DEFAULT_OVERLAP, out_file=None, backend=None, report=print):
+    curve = []
+    report(f"{'workers':>7}  {'wall s':>9}  {'RTF':>6}  {'speedup':>7}")
+    for n in worker_counts:
+        res = transcribe_chunked(media_path, model_name, task, window, overlap, workers=n, out_file=out_file, backend=backend)
+        base = curve[0]["elapsed"] if curve else res["elapsed"]
+        point = {"workers": n, "elapsed": res["elapsed"], "rtf": res["elapsed"] / res["duration"], "speedup": base / res["elapsed"]}
+        curve.append(point)
+        report(f"{n:>7}  {point['elapsed']:>9.1f}  {point['rtf']:>6.3f}  {point['speedup']:>6.2f}x")
+    return curve
@@ -0,0 +1,200 @@
+import sys
+import argparse
+
+from capit import MODEL_PRIORITY
+from capit.backends import BACKENDS, DEFAULT_BACKEND
+from capit.engine import TASK_CHOICES
+
+
+def cmd_batch(args):
+    from capit.batch import collect_media, run_batch
+    from capit.throughput import parse_deadline
+    if args.long_media:
+        unsupported = [flag for flag, on in (("--task both", args.task == "both"), ("--vad", args.vad),
+                                             ("--temp-wav", args.temp_wav), ("--no-cache", args.no_cache)) if on]
+        if unsupported:
+            print(f"--long-media cannot be combined with {', '.join(unsupported)}.", file=sys.stderr)
+            return 2
+    files = collect_media(args.targets)
+    if not files:
+        print("No media files found.", file=sys.stderr)
+        return 2
+    chunking = {"window": args.window, "overlap": args.overlap} if args.long_media else None
+    deadline = parse_deadline(args.deadline) if args.deadline else None
+    vad = {"energy_db": args.vad_energy, "modulation_db": args.vad_modulation, "min_pause": args.vad_min_pause} if args.vad else None
+    results = run_batch(files, args.model, args.task, workers=args.workers, force=args.force, budget_mb=args.model_budget,
+                        temp_wav=args.temp_wav, chunking=chunking, use_cache=not args.no_cache, backend=args.backend, deadline=deadline, vad=vad)
+    return 1 if any(r["status"] == "failed" for r in results) else 0
+
+
+def cmd_speedup(args):
+    import json
+    from capit.chunked import speedup_curve
+    counts = sorted({int(n) for n in args.workers.split(",")})
+    curve = speedup_curve(args.media, args.model, counts, args.task, args.window, args.overlap, out_file=args.out, backend=args.backend)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"media": args.media, "model": args.model, "window": args.window, "overlap": args.overlap, "curve": curve}, f, indent=2)
+    return 0
+
+
+def cmd_cache(args):
+    from capit.cache import cache
+    if args.clear:
+        cache.clear()
+    stats = cache.stats()
+    print(f"{cache.root}: {stats['entries']} entries, {stats['bytes'] / (1024 * 1024):.1f} MB, {stats['hits']} hits, {stats['misses']} misses")
+    return 0
+
+
+def cmd_download(args):
+    from capit.downloader import download_model
+    def progress(received, total):
+        done = f"{received / (1024 * 1024):.0f}" + (f" / {total / (1024 * 1024):.0f}" if total else "")
+        print(f"\r{args.model}: {done} MB", end="", flush=True)
+    path = download_model(args.model, segments=args.segments, progress=progress)
+    print(f"\n{path}")
+    return 0
+
+
+def cmd_bench(args):
+    import json
+    from capit import bench
+    lengths = [float(n) for n in args.lengths.split(",")]
+    models = args.models.split(",") if args.models else None
+    results = bench.run_bench(args.corpus, lengths, models, stub=args.stub, task=args.task, backend=args.backend)
+    if not results["results"]:
+        print("No installed models to benchmark; use --stub to exercise the pipeline without weights.", file=sys.stderr)
+        return 2
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        print()
+        bench.compare(bench.load_results(args.compare), results)
+    return 0
+
+
+def cmd_compare_backends(args):
+    import json
+    from capit.backends import compare_backends
+    rows = compare_backends(args.media, args.model, args.backends.split(","), args.task)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"media": args.media, "model": args.model, "task": args.task, "backends": rows}, f, indent=2)
+    return 0
+
+
+def cmd_recaption(args):
+    from capit.recaption import parse_ranges, recaption
+    ranges = [r for text in args.range for r in parse_ranges(text)]
+    res = recaption(args.media, ranges, args.model, args.task, backend=args.backend, out_file=args.srt)
+    spans = ", ".join(f"{start:.1f}-{end:.1f}s" for start, end in res["ranges"])
+    print(f"{res['srt']}: replaced {res['replaced']} cues with {res['segments']} in {spans} ({res['elapsed']:.1f}s)")
+    return 0
+
+
+def cmd_serve(args):
+    from capit.server import serve
+    serve(args.host, args.port, workers=args.workers, db=args.db, default_model=args.model,
+          preload=args.preload.split(",") if args.preload else None, budget_mb=args.model_budget, verbose=args.verbose)
+    return 0
+
+
+def add_backend_arg(parser):
+    parser.add_argument("--backend", choices=list(BACKENDS), default=DEFAULT_BACKEND, help="Inference backend (default: %(default)s).")
+
+
+def add_chunking_args(parser):
+    from capit.chunked import DEFAULT_WINDOW, DEFAULT_OVERLAP
+    parser.add_argument("--window", type=float, default=DEFAULT_WINDOW, metavar="SEC", help="Length of each long-media window.")
+    parser.add_argument("--overlap", type=float, default=DEFAULT_OVERLAP, metavar="SEC", help="Overlap between neighbouring windows.")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="capit", description="CapIT headless captioning.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    batch = sub.add_parser("batch", help="Caption many media files without the GUI.")
+    batch.add_argument("targets", nargs="+", help="Media files, directories or glob patterns.")
+    batch.add_argument("--task", choices=TASK_CHOICES, default="translate", help="\"both\" writes <name>.<lang>.srt and <name>.en.srt from one decode.")
+    batch.add_argument("--model", choices=MODEL_PRIORITY + ["auto"], default="small", help="\"auto\" picks the largest installed model expected to meet --deadline.")
+    batch.add_argument("--deadline", metavar="TIME", help="Target turnaround per file for --model auto, e.g. 45m, 2h or 1:30:00.")
+    batch.add_argument("--workers", type=int, default=1, help="Number of files processed in parallel.")
+    batch.add_argument("--force", action="store_true", help="Re-caption files that already have an up-to-date .srt.")
+    batch.add_argument("--model-budget", type=int, metavar="MB", help="Memory budget for resident models in each worker.")
+    batch.add_argument("--temp-wav", action="store_true", help="Extract audio to a temporary WAV instead of decoding in memory (not with --long-media).")
+    batch.add_argument("--no-cache", action="store_true", help="Always transcribe, ignoring the transcript cache (not with --long-media).")
+    batch.add_argument("--long-media", action="store_true", help="Split each file into overlapping windows and transcribe them on --workers processes. Supports translate and transcribe only.")
+    batch.add_argument("--vad", action="store_true", help="Skip silence and music before decoding (not with --long-media).")
+    batch.add_argument("--vad-energy", type=float, metavar="DBFS", help="Quietest level treated as speech (default -45).")
+    batch.add_argument("--vad-modulation", type=float, metavar="DB", help="Minimum loudness variation of speech; raise it to skip more music (default 4).")
+    batch.add_argument("--vad-min-pause", type=float, metavar="SEC", help="Shorter gaps between speech are kept (default 0.5).")
+    add_chunking_args(batch)
+    add_backend_arg(batch)
+    batch.set_defaults(func=cmd_batch)
+
+    speedup = sub.add_parser("speedup", help="Measure long-media speedup against the number of workers.")
+    speedup.add_argument("media")
+    speedup.add_argument("--task", choices=["translate", "transcribe"], default="translate")
+    speedup.add_argument("--model", choices=MODEL_PRIORITY, default="small")
+    speedup.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts to try.")
+    speedup.add_argument("--out", help="Where to write the SRT (defaults to next to the media).")
+    speedup.add_argument("--json", help="Also write the curve to this JSON file.")
+    add_chunking_args(speedup)
+    add_backend_arg(speedup)
+    speedup.set_defaults(func=cmd_speedup)
+
+    download = sub.add_parser("download", help="Download and verify a model into the Whisper cache.")
+    download.add_argument("model", choices=MODEL_PRIORITY)
+    download.add_argument("--segments", type=int, default=4, help="Parallel ranged connections.")
+    download.set_defaults(func=cmd_download)
+
+    bench = sub.add_parser("bench", help="Measure wall time, peak RSS and real-time factor per pipeline stage.")
+    bench.add_argument("--corpus", help="Directory of media to use instead of the synthetic corpus.")
+    bench.add_argument("--lengths", default="30,120,600", help="Synthetic clip lengths in seconds.")
+    bench.add_argument("--models", help="Comma-separated models (defaults to every installed one).")
+    bench.add_argument("--stub", action="store_true", help="Use a stub model so the harness runs without weights.")
+    bench.add_argument("--task", choices=["translate", "transcribe"], default="translate")
+    bench.add_argument("--out", help="Write JSON results to this file.")
+    bench.add_argument("--compare", metavar="JSON", help="Compare against an earlier results file.")
+    add_backend_arg(bench)
+    bench.set_defaults(func=cmd_bench)
+
+    compare = sub.add_parser("compare-backends", help="Compare speed and output drift between inference backends.")
+    compare.add_argument("media")
+    compare.add_argument("--model", choices=MODEL_PRIORITY, default="small")
+    compare.add_argument("--backends", default="whisper,whisper-int8", help="Comma-separated backends; the first is the reference for drift.")
+    compare.add_argument("--task", choices=["translate", "transcribe"], default="translate")
+    compare.add_argument("--json", help="Also write the comparison, including full texts, to this JSON file.")
+    compare.set_defaults(func=cmd_compare_backends)
+
+    recap = sub.add_parser("recaption", help="Re-caption time ranges of a file and splice them into its existing SRT.")
+    recap.add_argument("media")
+    recap.add_argument("--range", action="append", required=True, metavar="START-END", help="e.g. 12:30-14:45; repeat or comma-separate for several.")
+    recap.add_argument("--task", choices=["translate", "transcribe"], default="translate")
+    recap.add_argument("--model", choices=MODEL_PRIORITY, default="small")
+    recap.add_argument("--srt", help="SRT to update (defaults to the one next to the media).")
+    add_backend_arg(recap)
+    recap.set_defaults(func=cmd_recaption)
+
+    serve = sub.add_parser("serve", help="Run a local job server that keeps models loaded between jobs.")
+    serve.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: %(default)s).")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--workers", type=int, default=1, help="Jobs processed at the same time.")
+    serve.add_argument("--model", choices=MODEL_PRIORITY, default="small", help="Model for jobs that do not name one.")
+    serve.add_argument("--preload", help="Comma-separated models to load at start-up.")
+    serve.add_argument("--model-budget", type=int, metavar="MB", help="Memory budget for resident models.")
+    serve.add_argument("--db", help="Job queue database (default: ~/.cache/capit/jobs.sqlite3).")
+    serve.add_argument("--verbose", action="store_true", help="Log every request.")
+    serve.set_defaults(func=cmd_serve)
+
+    cache = sub.add_parser("cache", help="Show transcript cache statistics.")
+    cache.add_argument("--clear", action="store_true", help="Delete every cached transcript.")
+    cache.set_defaults(func=cmd_cache)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,167 @@
+import os
+import time
+import hashlib
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from capit import model_cache_dir
+
+CHUNK_BYTES = 1 << 20
+RETRIES = 5
+
+
+class ChecksumError(Exception):
+    pass
+
+
+def model_source(name):
+    # whisper's own table; the SHA-256 is the second-to-last URL component
+    import whisper
+    url = whisper._MODELS[name]
+    return url, url.split("/")[-2], os.path.join(model_cache_dir(), os.path.basename(url))
+
+
+class Downloader:
+    # Fetches url into dest via <dest>.part files. Interrupted downloads resume
+    # with HTTP Range requests, large files can be split into parallel ranged
+    # segments, and the result is only renamed into place once its SHA-256
+    # matches. progress(received, total) is called with the bytes actually
+    # received so far.
+
+    def __init__(self, url, dest, sha256=None, segments=1, progress=None, timeout=30, min_interval=0.1):
+        self.url = url
+        self.dest = dest
+        self.sha256 = sha256
+        self.segments = max(1, segments)
+        self.progress = progress
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self.received = 0
+        self.total = None
+        self._lock = threading.Lock()
+        self._last_emit = 0.0
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _emit(self, force=False):
+        now = time.monotonic()
+        if self.progress and (force or now - self._last_emit >= self.min_interval):
+            self._last_emit = now
+            self.progress(self.received, self.total)
+
+    def _add(self, n):
+        with self._lock:
+            self.received += n
+        self._emit()
+
+    def _probe(self):
+        req = urllib.request.Request(self.url, method="HEAD")
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                length = resp.headers.get("Content-Length")
+                ranged = resp.headers.get("Accept-Ranges", "").lower() == "bytes"
+        except urllib.error.HTTPError:
+            # Some servers refuse HEAD; fall back to a plain, non-resumable GET
+            return None, False
+        return (int(length) if length else None), ranged
+
+    def _fetch(self, part, start, end):
+        # Fill part with bytes start..end (inclusive; end=None means to EOF),
+        # resuming from whatever part already holds
+        for attempt in range(RETRIES):
+            have = os.path.getsize(part) if os.path.exists(part) else 0
+            # Last byte this part still needs; a full single-segment part would
+            # otherwise ask for bytes=<total>- and get a 416
+            last = end if end is not None else (self.total - 1 if self.total else None)
+            if last is not None and start + have > last:
+                return
+            headers = {"Range": f"bytes={start + have}-{'' if end is None else end}"} if (have or start or end is not None) else {}
+            try:
+                req = urllib.request.Request(self.url, headers=headers)
+                with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                    if headers and resp.status != 206:
+                        # Server ignored the range: start this part over
+                        with self._lock:
+                            self.received -= have
+                        have, mode = 0, "wb"
+                        if start or end is not None:
+                            raise RuntimeError("Server does not support ranged downloads.")
+                    else:
+                        mode = "ab"
+                    expected = resp.headers.get("Content-Length")
+                    written = 0
+                    with open(part, mode) as f:
+                        while True:
+                            if self._cancel.is_set():
+                                raise InterruptedError("Download cancelled.")
+                            chunk = resp.read(CHUNK_BYTES)
+                            if not chunk: break
+                            f.write(chunk)
+                            written += len(chunk)
+                            self._add(len(chunk))
+                    if expected and written < int(expected):
+                        # A dropped connection looks like a short read; resume it
+                        raise ConnectionError(f"Connection dropped after {written} of {expected} bytes.")
+                return
+            except OSError as e:
+                if isinstance(e, urllib.error.HTTPError) and e.code == 416 and have:
+                    # Nothing left past what the part holds: it is already complete
+                    return
+                if isinstance(e, InterruptedError) or attempt == RETRIES - 1:
+                    raise
+                time.sleep(min(2 ** attempt, 10))
+
+    def _plan(self, ranged):
+        if self.segments == 1 or not ranged or not self.total:
+            return [(f"{self.dest}.part", 0, None)]
+        size = -(-self.total // self.segments)
+        return [(f"{self.dest}.part{i}", start, min(start + size, self.total) - 1)
+                for i, start in enumerate(range(0, self.total, size))]
+
+    def _verify(self, path):
+        if not self.sha256: return
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_BYTES), b""):
+                h.update(chunk)
+        if h.hexdigest() != self.sha256:
+            os.remove(path)
+            raise ChecksumError(f"SHA-256 mismatch for {os.path.basename(self.dest)}; the partial file was removed, please retry.")
+
+    def run(self):
+        os.makedirs(os.path.dirname(self.dest) or ".", exist_ok=True)
+        self.total, ranged = self._probe()
+        plan = self._plan(ranged)
+        self.received = sum(os.path.getsize(p) for p, _, _ in plan if os.path.exists(p))
+        self._emit(force=True)
+        if len(plan) == 1:
+            self._fetch(*plan[0])
+            final = plan[0][0]
+        else:
+            with ThreadPoolExecutor(max_workers=len(plan)) as pool:
+                for fut in [pool.submit(self._fetch, *p) for p in plan]:
+                    fut.result()
+            final = f"{self.dest}.part"
+            with open(final, "wb") as out:
+                for p, _, _ in plan:
+                    with open(p, "rb") as f:
+                        for chunk in iter(lambda: f.read(CHUNK_BYTES), b""):
+                            out.write(chunk)
+            for p, _, _ in plan: os.remove(p)
+        if self.total is not None and os.path.getsize(final) != self.total:
+            raise IOError(f"Incomplete download: {os.path.getsize(final)} of {self.total} bytes.")
+        self._verify(final)
+        os.replace(final, self.dest)
+        self._emit(force=True)
+        return self.dest
+
+
+def download_model(name, segments=4, progress=None):
+    url, sha256, dest = model_source(name)
+    if os.path.exists(dest):
+        return dest
+    return Downloader(url, dest, sha256, segments=segments, progress=progress).run()
@@ -0,0 +1,167 @@
+import os
+import time
+
+from capit import engine
+from capit.audio import load_audio
+from capit.backends import get_backend, model_id
+from capit.cache import audio_fingerprint, cache
+from capit.registry import registry
+from capit.vad import compact, detect_speech, vad_tag
+
+TASKS = ("transcribe", "translate")
+# whisper.transcribe's defaults for re-decoding a window that came out
+# repetitive or unlikely
+TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+def dual_paths(media_path, language):
+    base = os.path.splitext(media_path)[0]
+    return {"transcribe": f"{base}.{language}.srt", "translate": f"{base}.en.srt"}
+
+
+def _parse_segments(tokens, tokenizer, offset, window_seconds):
+    # Split a timestamped decode into segments the way whisper.transcribe
+    # does: <|t0|> text <|t1|><|t1|> text <|t2|> ... Returns the segments and
+    # how many seconds of the window they cover.
+    ts_begin = tokenizer.timestamp_begin
+    segs, text, start, last_end = [], [], None, None
+    for t in tokens:
+        if t < ts_begin:
+            text.append(t)
+            continue
+        ts = (t - ts_begin) * 0.02
+        if start is not None and text:
+            segs.append({"start": offset + start, "end": offset + ts, "text": tokenizer.decode(text)})
+            last_end, text, start = ts, [], None
+        else:
+            start = ts
+    if text and not segs:
+        # No segment was closed (no timestamps, or only an opening one): like
+        # whisper.transcribe, the whole window becomes one segment
+        return [{"start": offset, "end": offset + window_seconds, "text": tokenizer.decode(text)}], window_seconds
+    if text:
+        # Unterminated text: the speech runs past the window, decode it again next time
+        return segs, last_end if last_end is not None else window_seconds
+    return segs, window_seconds
+
+
+def _decode_with_fallback(model, features, task, language, fp16, prompt):
+    # Same retry ladder as whisper.transcribe, on the already encoded
+    # features: greedy first, then sampling (best of 5) at rising temperatures
+    from whisper.decoding import DecodingOptions
+
+    for temperature in TEMPERATURES:
+        extra = {"best_of": 5} if temperature > 0 else {}
+        options = DecodingOptions(task=task, language=language, fp16=fp16, prompt=prompt, temperature=temperature, **extra)
+        result = model.decode(features, options)[0]
+        if result.no_speech_prob > NO_SPEECH_THRESHOLD:
+            break
+        if result.compression_ratio <= COMPRESSION_RATIO_THRESHOLD and result.avg_logprob >= LOGPROB_THRESHOLD:
+            break
+    return result
+
+
+def transcribe_both(model, audio, fp16=False, language=None, progress=None):
+    # One log-mel pass over the whole file and one encoder pass per 30 s
+    # window; both tasks decode from the same audio features. The window
+    # advance follows the transcription, and translated segments past that
+    # point are left for the next window. Each task falls back to higher
+    # temperatures on its own, as whisper.transcribe would.
+    import torch
+    from whisper.audio import HOP_LENGTH, N_FRAMES, N_SAMPLES, SAMPLE_RATE, log_mel_spectrogram, pad_or_trim
+    from whisper.tokenizer import get_tokenizer
+
+    dtype = torch.float16 if fp16 else torch.float32
+    mel = log_mel_spectrogram(audio, model.dims.n_mels, padding=N_SAMPLES)
+    content_frames = mel.shape[-1] - N_FRAMES
+    extra = {"num_languages": model.num_languages} if hasattr(model, "num_languages") else {}
+    outputs = {task: [] for task in TASKS}
+    prompts = {task: [] for task in TASKS}
+    tasks = TASKS
+    seek = 0
+    while seek < content_frames:
+        offset = seek * HOP_LENGTH / SAMPLE_RATE
+        seg_frames = min(N_FRAMES, content_frames - seek)
+        window_seconds = seg_frames * HOP_LENGTH / SAMPLE_RATE
+        mel_segment = pad_or_trim(mel[:, seek:seek + seg_frames], N_FRAMES).to(model.device).to(dtype)
+        with torch.no_grad():
+            features = model.embed_audio(mel_segment[None])
+        if language is None:
+            _, probs = model.detect_language(features)
+            language = max(probs[0], key=probs[0].get)
+            if language == "en":
+                # Translating English to English is the transcription again
+                tasks = ("transcribe",)
+        consumed = window_seconds
+        for task in tasks:
+            tokenizer = get_tokenizer(model.is_multilingual, language=language, task=task, **extra)
+            result = _decode_with_fallback(model, features, task, language, fp16, prompts[task][-223:] or None)
+            if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+                continue
+            segs, covered = _parse_segments(result.tokens, tokenizer, offset, window_seconds)
+            if task == "transcribe":
+                consumed = covered
+            else:
+                segs = [s for s in segs if (s["start"] + s["end"]) / 2 < offset + consumed]
+            outputs[task].extend(segs)
+            # A high-temperature decode is a poor prompt for the next window
+            prompts[task] = [] if result.temperature > 0.5 else prompts[task] + result.tokens
+        seek += max(1, round(consumed * SAMPLE_RATE / HOP_LENGTH))
+        if progress: progress(min(seek / content_frames, 1.0))
+    return language, {task: outputs[task] for task in tasks}
+
+
+def caption_both(media_path, model_name, progress=None, use_cache=True, backend=None, vad=None):
+    if get_backend(backend).name not in ("whisper", "whisper-int8"):
+        raise ValueError("The \"both\" task needs a Whisper (PyTorch) backend.")
+    progress = progress or (lambda status, value: None)
+    mid = model_id(model_name, backend) + (vad_tag(vad) if vad else "")
+    skipped = None
+    started = time.perf_counter()
+    progress("Extracting Audio...", 0.10)
+    total_duration = engine.probe_duration(media_path)
+    audio = load_audio(media_path, expected_duration=total_duration)
+    fingerprint = audio_fingerprint(audio) if use_cache else None
+    hits = {task: cache.get(fingerprint, mid, task) for task in TASKS} if fingerprint else {}
+    cached = bool(hits) and all(hits.values())
+    if cached:
+        progress("Loaded from cache", 0.9)
+        language = hits["transcribe"]["language"] or "und"
+        results = {task: hit["segments"] for task, hit in hits.items()}
+    else:
+        timeline = None
+        if vad:
+            audio, timeline, skipped = compact(audio, detect_speech(audio, **vad))
+            progress(f"Voice detection: skipping {skipped:.0%} of the audio", 0.2)
+        progress("Loading AI Model...", 0.25)
+        key = registry.key(model_name, backend=backend)
+        model = registry.get(*key)
+        progress("AI Processing...", 0.3)
+        with registry.decode_lock(key):
+            language, results = transcribe_both(model, audio, registry.options(key).get("fp16", False), progress=lambda v: progress(None, 0.3 + 0.7 * v))
+        language = language or "und"
+        if timeline:
+            results = {task: timeline.map_segments(segs) for task, segs in results.items()}
+        results.setdefault("translate", results["transcribe"])
+        if fingerprint:
+            for task in TASKS:
+                cache.put(fingerprint, mid, task, results[task], language)
+    paths = dual_paths(media_path, language)
+    outputs = []
+    for task in TASKS:
+        if paths[task] not in outputs:
+            outputs.append(engine.write_srt(results[task], paths[task]))
+    return {
+        "path": media_path,
+        "srt": outputs[0],
+        "outputs": outputs,
+        "language": language,
+        "duration": total_duration,
+        "elapsed": time.perf_counter() - started,
+        "segments": sum(len(results[task]) for task in TASKS),
+        "cached": cached,
+        "vad_skipped": skipped,
+    }
@@ -0,0 +1,196 @@
+import os
+import time
+import tempfile
+
+from capit.audio import SAMPLE_RATE, load_audio, read_wav
+from capit.backends import model_id
+from capit.cache import audio_fingerprint, cache
+from capit.checkpoint import Checkpoint
+from capit.registry import registry
+from capit.throughput import stats
+from capit.vad import compact, detect_speech, vad_options, vad_tag
+
+SPAN_SECONDS = 120.0
+# A span's last segment ending this close to the span edge may be cut off
+EDGE_SECONDS = 2.0
+TASK_CHOICES = ["translate", "transcribe", "both"]
+
+
+def format_timestamp(seconds):
+    # Same output as whisper.utils.format_timestamp so SRTs stay byte-identical
+    milliseconds = round(seconds * 1000.0)
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    secs, milliseconds = divmod(milliseconds, 1_000)
+    hours_marker = f"{hours:02d}:" if hours > 0 else ""
+    return f"{hours_marker}{minutes:02d}:{secs:02d}.{milliseconds:03d}"
+
+
+def srt_path(media_path):
+    return os.path.splitext(media_path)[0] + ".srt"
+
+
+def format_cue(index, seg):
+    return f"{index}\n{format_timestamp(seg['start'])} --> {format_timestamp(seg['end'])}\n{seg['text'].strip()}\n\n"
+
+
+def probe_duration(media_path):
+    import ffmpeg
+    probe = ffmpeg.probe(media_path)
+    return float(probe['format']['duration'])
+
+
+def extract_audio(media_path, wav_path, start=None):
+    import ffmpeg
+    in_args = {"ss": start} if start else {}
+    ffmpeg.input(media_path, **in_args).output(wav_path, acodec="pcm_s16le", ac=1, ar="16000").overwrite_output().run(quiet=True)
+
+
+def load_model(name, device=None, precision=None, backend=None):
+    return registry.get(name, device, precision, backend)
+
+
+class SrtWriter:
+    # Appends cues as they are decoded. Works in bytes so the checkpoint can
+    # record an exact offset to truncate back to after a crash.
+
+    def __init__(self, out_file, resume=None):
+        self.out_file = out_file
+        if resume is not None:
+            self.f = open(out_file, "r+b")
+            self.f.truncate(resume.srt_bytes)
+            self.f.seek(resume.srt_bytes)
+            self.index = resume.cues
+        else:
+            self.f = open(out_file, "wb")
+            self.index = 0
+
+    def write(self, seg):
+        self.index += 1
+        self.f.write(format_cue(self.index, seg).replace("\n", os.linesep).encode("utf-8"))
+
+    def flush(self):
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        return self.f.tell()
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_srt(segments, out_file, total_duration=None, progress=None):
+    with SrtWriter(out_file) as writer:
+        for seg in segments:
+            if progress and total_duration:
+                progress(None, 0.3 + (0.7 * (seg['end'] / total_duration)))
+            writer.write(seg)
+    return out_file
+
+
+def transcribe_spans(model, audio, task, offset=0.0, span=SPAN_SECONDS, prompt=None, language=None, **options):
+    # Decodes the audio a span at a time and yields (segments, position,
+    # language, prompt) after each one, with timestamps on the original
+    # timeline.
+    # A last segment ending near the span edge may be cut off, so it is
+    # dropped and decoded again at the start of the next span.
+    pos, total = 0, len(audio)
+    while pos < total:
+        end = min(pos + int(span * SAMPLE_RATE), total)
+        result = model.transcribe(audio[pos:end], task=task, initial_prompt=prompt, language=language, **options)
+        segs = result["segments"]
+        next_pos = end
+        if end < total and len(segs) > 1 and segs[-1]["start"] > 0 and segs[-1]["end"] >= (end - pos) / SAMPLE_RATE - EDGE_SECONDS:
+            next_pos = pos + int(segs[-1]["start"] * SAMPLE_RATE)
+            segs = segs[:-1]
+        base = offset + pos / SAMPLE_RATE
+        segs = [{"start": base + seg["start"], "end": base + seg["end"], "text": seg["text"]} for seg in segs]
+        language = language or result.get("language")
+        if segs:
+            prompt = " ".join(seg["text"].strip() for seg in segs[-3:])
+        pos = next_pos
+        yield segs, offset + pos / SAMPLE_RATE, language, prompt
+
+
+def transcribe_file(media_path, model_name, task="translate", progress=None, temp_wav=False, use_cache=True, backend=None, vad=None):
+    # vad: None, or voice-detection settings (see capit.vad) to decode only
+    # the speech regions
+    vad = vad_options(vad)
+    if task == "both":
+        from capit.dual import caption_both
+        res = caption_both(media_path, model_name, progress, use_cache, backend, vad)
+        if not res["cached"]: stats.record(model_name, res["duration"] * (1 - (res["vad_skipped"] or 0)), res["elapsed"], backend, task)
+        return res
+    progress = progress or (lambda status, value: None)
+    started = time.perf_counter()
+    out_file = srt_path(media_path)
+    mid = model_id(model_name, backend) + (vad_tag(vad) if vad else "")
+    ckpt = Checkpoint(out_file, media_path, mid, task)
+    resumed = ckpt.load() and os.path.exists(out_file)
+    start = ckpt.position if resumed else 0.0
+    temp_path = None
+    decoded = []
+    cached = False
+    skipped = None
+    try:
+        progress(f"Resuming from {format_timestamp(start)}..." if resumed else "Extracting Audio...", 0.10)
+        total_duration = probe_duration(media_path)
+        if temp_wav:
+            fd, temp_path = tempfile.mkstemp(prefix="capit_", suffix=".wav")
+            os.close(fd)
+            extract_audio(media_path, temp_path, start=start)
+            audio = read_wav(temp_path)
+        else:
+            audio = load_audio(media_path, start=start, expected_duration=total_duration - start)
+        # A resumed job only has the tail of the audio, so it can't be fingerprinted
+        fingerprint = audio_fingerprint(audio) if use_cache and not resumed else None
+        hit = cache.get(fingerprint, mid, task) if fingerprint else None
+        if hit is not None:
+            progress("Loaded from cache", 0.9)
+            decoded, cached = hit["segments"], True
+            write_srt(decoded, out_file)
+        else:
+            timeline = None
+            if vad:
+                audio, timeline, skipped = compact(audio, detect_speech(audio, **vad), offset=start)
+                progress(f"Voice detection: skipping {skipped:.0%} of the audio", 0.2)
+            progress("Loading AI Model...", 0.25)
+            key = registry.key(model_name, backend=backend)
+            model = load_model(*key)
+            progress("AI Processing...", 0.3 + 0.7 * start / total_duration)
+            with registry.decode_lock(key), SrtWriter(out_file, ckpt if resumed else None) as writer:
+                spans = transcribe_spans(model, audio, task, offset=0.0 if timeline else start, prompt=ckpt.prompt, language=ckpt.language, **registry.options(key))
+                for segs, position, language, prompt in spans:
+                    if timeline:
+                        segs, position = timeline.map_segments(segs), timeline.position(position)
+                    for seg in segs:
+                        writer.write(seg)
+                    decoded.extend(segs)
+                    ckpt.srt_bytes = writer.flush()
+                    ckpt.cues, ckpt.position, ckpt.language, ckpt.prompt = writer.index, position, language, prompt
+                    ckpt.save()
+                    progress(None, 0.3 + 0.7 * min(position / total_duration, 1.0))
+            if fingerprint:
+                cache.put(fingerprint, mid, task, decoded, ckpt.language)
+        ckpt.remove()
+    finally:
+        if temp_path and os.path.exists(temp_path): os.remove(temp_path)
+    elapsed = time.perf_counter() - started
+    if not cached:
+        # With voice detection only the speech was decoded; measure against that
+        stats.record(model_name, (total_duration - start) * (1 - (skipped or 0)), elapsed, backend, task)
+    return {
+        "path": media_path,
+        "srt": out_file,
+        "duration": total_duration,
+        "elapsed": elapsed,
+        "segments": ckpt.cues if resumed else len(decoded),
+        "resumed_from": start,
+        "cached": cached,
+        "vad_skipped": skipped,
+    }
@@ -0,0 +1,120 @@
+import os
+import re
+import time
+
+from capit import engine
+from capit.audio import load_audio
+from capit.checkpoint import has_checkpoint
+from capit.registry import registry
+
+_TIMING = re.compile(r"^\s*(\S+)\s*-->\s*(\S+)")
+
+
+def parse_timestamp(text):
+    # Accepts [HH:]MM:SS.mmm as CapIT writes it, standard SRT HH:MM:SS,mmm and
+    # plain seconds
+    seconds = 0.0
+    for part in text.strip().replace(",", ".").split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def parse_range(text):
+    # "12:30-14:45" -> (750.0, 885.0)
+    start, sep, end = text.partition("-")
+    if not sep:
+        raise ValueError(f"Time range {text!r} must look like START-END.")
+    start, end = parse_timestamp(start), parse_timestamp(end)
+    if end <= start:
+        raise ValueError(f"Time range {text!r} ends before it starts.")
+    return start, end
+
+
+def parse_ranges(text):
+    # "12:30-14:45, 1:02:00-1:03:10"
+    return [parse_range(r) for r in re.split(r"[,;]", text) if r.strip()]
+
+
+def read_srt(path):
+    cues = []
+    with open(path, "r", encoding="utf-8") as f:
+        blocks = re.split(r"\n\s*\n", f.read().strip())
+    for block in blocks:
+        lines = block.splitlines()
+        for i, line in enumerate(lines):
+            m = _TIMING.match(line)
+            if m:
+                cues.append({"start": parse_timestamp(m.group(1)), "end": parse_timestamp(m.group(2)), "text": "\n".join(lines[i + 1:])})
+                break
+    return cues
+
+
+def plan_ranges(ranges, cues, duration):
+    # Widens each range to the edges of the cues it cuts through so no cue is
+    # left half-replaced, then merges ranges that now touch
+    spans = []
+    for start, end in sorted(ranges):
+        for c in cues:
+            if c["start"] < start < c["end"]: start = c["start"]
+            if c["start"] < end < c["end"]: end = c["end"]
+        start, end = max(0.0, start), min(end, duration)
+        if end <= start: continue
+        if spans and start <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+        else:
+            spans.append((start, end))
+    return spans
+
+
+def splice(cues, spans, new_segments):
+    kept = [c for c in cues if not any(c["start"] < end and c["end"] > start for start, end in spans)]
+    return sorted(kept + new_segments, key=lambda c: (c["start"], c["end"]))
+
+
+def recaption(media_path, ranges, model_name, task="translate", progress=None, backend=None, out_file=None):
+    # Re-transcribes only the given (start, end) ranges and splices the result
+    # into the existing SRT; everything outside them is kept as it is
+    if task == "both":
+        raise ValueError("Re-captioning supports translate or transcribe, not both.")
+    progress = progress or (lambda status, value: None)
+    started = time.perf_counter()
+    out_file = out_file or engine.srt_path(media_path)
+    if not os.path.exists(out_file):
+        raise FileNotFoundError(f"No captions to update at {out_file}; caption the whole file first.")
+    if has_checkpoint(out_file):
+        raise RuntimeError(f"{out_file} is from an unfinished job; finish it before re-captioning a range.")
+
+    progress("Reading captions...", 0.05)
+    cues = read_srt(out_file)
+    duration = engine.probe_duration(media_path)
+    spans = plan_ranges(ranges, cues, duration)
+    span_total = sum(end - start for start, end in spans) or 1.0
+
+    progress("Loading AI Model...", 0.1)
+    key = registry.key(model_name, backend=backend)
+    model = engine.load_model(*key)
+    new_segments, done = [], 0.0
+    with registry.decode_lock(key):
+        for start, end in spans:
+            progress(f"Re-captioning {engine.format_timestamp(start)} - {engine.format_timestamp(end)}...", 0.15 + 0.8 * done / span_total)
+            audio = load_audio(media_path, start=start, duration=end - start)
+            # The cues just before the range keep wording and names consistent
+            before = [c["text"].strip() for c in cues if c["end"] <= start][-3:]
+            for segs, position, _, _ in engine.transcribe_spans(model, audio, task, offset=start, prompt=" ".join(before) or None, **registry.options(key)):
+                new_segments.extend({"start": max(s["start"], start), "end": min(s["end"], end), "text": s["text"]} for s in segs if s["start"] < end)
+                progress(None, 0.15 + 0.8 * (done + min(position, end) - start) / span_total)
+            done += end - start
+
+    merged = splice(cues, spans, new_segments)
+    tmp = out_file + ".tmp"
+    engine.write_srt(merged, tmp)
+    os.replace(tmp, out_file)
+    return {
+        "path": media_path,
+        "srt": out_file,
+        "duration": duration,
+        "elapsed": time.perf_counter() - started,
+        "ranges": spans,
+        "replaced": len(cues) + len(new_segments) - len(merged),
+        "segments": len(new_segments),
+    }
@@ -0,0 +1,130 @@
+import os
+import gc
+import threading
+from collections import OrderedDict
+
+from capit import MODEL_SIZES
+from capit.backends import get_backend
+
+DEFAULT_BUDGET_MB = int(os.environ.get("CAPIT_MODEL_BUDGET_MB", "4096"))
+
+
+class ModelRegistry:
+    # Process-wide LRU of loaded models keyed by (name, device, precision,
+    # backend). Resident size is estimated from MODEL_SIZES, which track the
+    # checkpoint size on disk and are close to the fp32 weights held in
+    # memory, scaled by the backend's memory factor.
+
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB):
+        self.budget_mb = budget_mb
+        self._models = OrderedDict()
+        self._loading = {}
+        self._decode_locks = {}
+        self._lock = threading.RLock()
+
+    def key(self, name, device=None, precision=None, backend=None):
+        backend = get_backend(backend)
+        device = device or backend.default_device()
+        precision = precision or backend.default_precision(device)
+        return (name, device, precision, backend.name)
+
+    def options(self, key):
+        # Extra transcribe() arguments implied by the key's precision
+        return get_backend(key[3]).options(key[2])
+
+    def get(self, name, device=None, precision=None, backend=None):
+        key = self.key(name, device, precision, backend)
+        while True:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    return self._models[key]
+                event = self._loading.get(key)
+                owner = event is None
+                if owner:
+                    event = self._loading[key] = threading.Event()
+            if owner:
+                break
+            # Someone else is loading the same weights; wait instead of loading twice
+            event.wait()
+
+        try:
+            model = self._load(*key)
+            with self._lock:
+                self._models[key] = model
+                self._evict(keep=key)
+            return model
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            event.set()
+
+    def _load(self, name, device, precision, backend):
+        return get_backend(backend).load(name, device, precision)
+
+    def decode_lock(self, key):
+        # openai-whisper's kv-cache hooks sit on the model's own modules, so
+        # two threads decoding with one instance corrupt each other; callers
+        # hold this while they decode
+        with self._lock:
+            return self._decode_locks.setdefault(key, threading.Lock())
+
+    def preload(self, name, device=None, precision=None, backend=None, on_ready=None):
+        def run():
+            try:
+                self.get(name, device, precision, backend)
+                if on_ready: on_ready(self.key(name, device, precision, backend))
+            except Exception: pass
+        t = threading.Thread(target=run, daemon=True)
+        t.start()
+        return t
+
+    def resident_mb(self):
+        with self._lock:
+            return sum(MODEL_SIZES.get(k[0], 0) * get_backend(k[3]).memory_factor for k in self._models)
+
+    def resident(self):
+        with self._lock:
+            return list(self._models)
+
+    def _evict(self, keep=None):
+        evicted = False
+        while self.resident_mb() > self.budget_mb:
+            victim = next((k for k in self._models if k != keep), None)
+            if victim is None: break
+            del self._models[victim]
+            evicted = True
+        if evicted: self._release()
+
+    def discard(self, name):
+        with self._lock:
+            for k in [k for k in self._models if k[0] == name]:
+                del self._models[k]
+        self._release()
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+        self._release()
+
+    def _release(self):
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available(): torch.cuda.empty_cache()
+        except ImportError:
+            pass
+
+
+registry = ModelRegistry()
+
+
+def init_worker(threads, budget_mb=None):
+    # ProcessPoolExecutor initializer for batch and long-media workers: each
+    # gets its share of the cores instead of all of them
+    if budget_mb: registry.budget_mb = budget_mb
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
@@ -0,0 +1,234 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from capit import MODEL_PRIORITY
+from capit import engine
+from capit.backends import BACKENDS, DEFAULT_BACKEND
+from capit.registry import registry
+
+DEFAULT_DB = os.environ.get("CAPIT_JOBS_DB") or os.path.join(os.path.expanduser("~"), ".cache", "capit", "jobs.sqlite3")
+DEFAULT_PORT = 8765
+FIELDS = ["id", "media", "task", "model", "backend", "status", "progress", "message", "outputs", "error", "created", "started", "finished"]
+
+
+class JobStore:
+    # Persistent job queue in SQLite. Jobs that were running when the server
+    # stopped go back to the queue on start-up and resume from their SRT
+    # checkpoint.
+
+    def __init__(self, path=DEFAULT_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        with self.lock:
+            self.db.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY, media TEXT, task TEXT, model TEXT, backend TEXT, status TEXT,
+                progress REAL, message TEXT, outputs TEXT, error TEXT, created REAL, started REAL, finished REAL)""")
+            self.db.execute("UPDATE jobs SET status = 'queued', message = 'Requeued after restart' WHERE status = 'running'")
+
+    def _row(self, row):
+        job = dict(zip(FIELDS, row))
+        job["outputs"] = json.loads(job["outputs"]) if job["outputs"] else []
+        return job
+
+    def submit(self, media, task, model, backend):
+        job_id = uuid.uuid4().hex[:12]
+        with self.lock:
+            # Re-submitting identical work that is already pending returns the
+            # existing job; other jobs for the same media wait in claim()
+            row = self.db.execute("SELECT id FROM jobs WHERE media = ? AND task = ? AND model = ? AND backend = ? AND status IN ('queued', 'running')",
+                                  (media, task, model, backend)).fetchone()
+            if row:
+                job_id = row[0]
+            else:
+                self.db.execute("INSERT INTO jobs (id, media, task, model, backend, status, progress, message, created) VALUES (?, ?, ?, ?, ?, 'queued', 0, 'Queued', ?)",
+                                (job_id, media, task, model, backend, time.time()))
+                self.wakeup.notify()
+        return self.get(job_id)
+
+    def get(self, job_id):
+        with self.lock:
+            row = self.db.execute(f"SELECT {', '.join(FIELDS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def list(self, status=None):
+        query = f"SELECT {', '.join(FIELDS)} FROM jobs" + (" WHERE status = ?" if status else "") + " ORDER BY created"
+        with self.lock:
+            rows = self.db.execute(query, (status,) if status else ()).fetchall()
+        return [self._row(r) for r in rows]
+
+    def counts(self):
+        with self.lock:
+            return dict(self.db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def claim(self, stop):
+        # Blocks until a queued job can be marked running, oldest first. Every
+        # task and model writes <name>.srt and its checkpoint, so a job waits
+        # while another one for the same media is running.
+        with self.lock:
+            while not stop.is_set():
+                row = self.db.execute("""SELECT id FROM jobs WHERE status = 'queued'
+                    AND media NOT IN (SELECT media FROM jobs WHERE status = 'running') ORDER BY created LIMIT 1""").fetchone()
+                if row:
+                    self.db.execute("UPDATE jobs SET status = 'running', started = ?, message = 'Starting' WHERE id = ?", (time.time(), row[0]))
+                    break
+                self.wakeup.wait(1.0)
+            else:
+                return None
+        return self.get(row[0])
+
+    def update(self, job_id, **fields):
+        if "outputs" in fields: fields["outputs"] = json.dumps(fields["outputs"])
+        with self.lock:
+            self.db.execute(f"UPDATE jobs SET {', '.join(f'{k} = ?' for k in fields)} WHERE id = ?", (*fields.values(), job_id))
+            # A finished job may unblock a queued one for the same media
+            if "status" in fields: self.wakeup.notify_all()
+
+    def cancel(self, job_id):
+        with self.lock:
+            cur = self.db.execute("UPDATE jobs SET status = 'cancelled', message = 'Cancelled', finished = ? WHERE id = ? AND status = 'queued'", (time.time(), job_id))
+        return cur.rowcount > 0
+
+
+class JobRunner:
+    # Fixed pool of worker threads sharing this process's model registry, so
+    # models stay resident between jobs. Jobs on the same loaded model take
+    # turns decoding (registry.decode_lock); other models run alongside.
+
+    def __init__(self, store, workers=1):
+        self.store = store
+        self.workers = workers
+        self.stop = threading.Event()
+        self.threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            t = threading.Thread(target=self._loop, name=f"capit-worker-{i}", daemon=True)
+            t.start()
+            self.threads.append(t)
+
+    def shutdown(self):
+        self.stop.set()
+        with self.store.lock:
+            self.store.wakeup.notify_all()
+
+    def _loop(self):
+        while not self.stop.is_set():
+            job = self.store.claim(self.stop)
+            if job: self._run(job)
+
+    def _run(self, job):
+        last = {"value": 0.0, "at": 0.0}
+
+        def progress(status, value):
+            # Throttle DB writes; status changes always go through
+            now = time.monotonic()
+            fields = {}
+            if status: fields["message"] = status
+            if value is not None and (status or value - last["value"] >= 0.01 or now - last["at"] >= 2):
+                fields["progress"] = round(value, 4)
+                last.update(value=value, at=now)
+            if fields: self.store.update(job["id"], **fields)
+
+        try:
+            res = engine.transcribe_file(job["media"], job["model"], job["task"], progress=progress, backend=job["backend"])
+            self.store.update(job["id"], status="done", progress=1.0, message="Cached" if res.get("cached") else "Complete",
+                              outputs=res.get("outputs", [res["srt"]]), finished=time.time())
+        except Exception as e:
+            self.store.update(job["id"], status="failed", message="Failed", error=str(e), finished=time.time())
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "CapIT"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose: super().log_message(fmt, *args)
+
+    def _send(self, code, body, content_type="application/json"):
+        data = body.encode("utf-8") if isinstance(body, str) else json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _parts(self):
+        url = urlparse(self.path)
+        return [p for p in url.path.split("/") if p], parse_qs(url.query)
+
+    def do_GET(self):
+        store = self.server.store
+        parts, query = self._parts()
+        if parts == ["health"]:
+            return self._send(200, {"workers": self.server.runner.workers, "jobs": store.counts(),
+                                    "resident_models": [list(k) for k in registry.resident()]})
+        if parts == ["jobs"]:
+            return self._send(200, store.list(query.get("status", [None])[0]))
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            job = store.get(parts[1])
+            if not job:
+                return self._send(404, {"error": "No such job."})
+            if len(parts) == 2:
+                return self._send(200, job)
+            if parts[2] == "srt":
+                if job["status"] != "done":
+                    return self._send(409, {"error": f"Job is {job['status']}."})
+                n = int(query.get("n", ["0"])[0])
+                if not 0 <= n < len(job["outputs"]):
+                    return self._send(404, {"error": "No such output."})
+                with open(job["outputs"][n], "r", encoding="utf-8") as f:
+                    return self._send(200, f.read(), "application/x-subrip")
+        self._send(404, {"error": "Not found."})
+
+    def do_POST(self):
+        parts, _ = self._parts()
+        if parts != ["jobs"]:
+            return self._send(404, {"error": "Not found."})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            return self._send(400, {"error": "Body must be JSON."})
+        media = body.get("media")
+        task = body.get("task", "translate")
+        model = body.get("model", self.server.default_model)
+        backend = body.get("backend", DEFAULT_BACKEND)
+        if not media or not os.path.isfile(media):
+            return self._send(400, {"error": f"Media file not found: {media}"})
+        if task not in engine.TASK_CHOICES or model not in MODEL_PRIORITY or backend not in BACKENDS:
+            return self._send(400, {"error": "Unknown task, model or backend."})
+        self._send(201, self.server.store.submit(os.path.abspath(media), task, model, backend))
+
+    def do_DELETE(self):
+        parts, _ = self._parts()
+        if len(parts) == 2 and parts[0] == "jobs":
+            if self.server.store.cancel(parts[1]):
+                return self._send(200, self.server.store.get(parts[1]))
+            return self._send(409, {"error": "Only queued jobs can be cancelled."})
+        self._send(404, {"error": "Not found."})
+
+
+def serve(host="127.0.0.1", port=DEFAULT_PORT, workers=1, db=DEFAULT_DB, default_model="small", preload=None, budget_mb=None, verbose=False):
+    db = db or DEFAULT_DB
+    if budget_mb: registry.budget_mb = budget_mb
+    store = JobStore(db)
+    runner = JobRunner(store, workers)
+    httpd = ThreadingHTTPServer((host, port), _Handler)
+    httpd.store, httpd.runner, httpd.default_model, httpd.verbose = store, runner, default_model, verbose
+    for name in preload or []:
+        registry.preload(name)
+    runner.start()
+    print(f"CapIT job server on http://{host}:{httpd.server_port} ({workers} worker{'s' if workers != 1 else ''}, queue: {db})")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        runner.shutdown()
+        httpd.server_close()
@@ -0,0 +1,122 @@
+import os
+import json
+import math
+import threading
+
+from capit import MODEL_PRIORITY, installed_models
+
+STATS_FILE = os.environ.get("CAPIT_THROUGHPUT_FILE") or os.path.join(os.path.expanduser("~"), ".cache", "capit", "throughput.json")
+ALPHA = 0.3
+# Rough wall seconds per media second before anything has been measured
+PRIOR_RTF = {
+    "cpu": {"tiny": 0.08, "base": 0.15, "small": 0.5, "medium": 1.5, "large": 3.0},
+    "cuda": {"tiny": 0.02, "base": 0.03, "small": 0.06, "medium": 0.12, "large": 0.2},
+}
+BACKEND_SPEED = {"whisper-int8": 0.6, "faster-whisper": 0.4, "stub": 0.0}
+# "both" shares the encoder pass but decodes twice
+TASK_COST = {"both": 1.8}
+
+
+def parse_deadline(text):
+    # "90m", "2h", "1:30:00" or plain seconds
+    text = text.strip().lower()
+    unit = {"s": 1, "m": 60, "h": 3600}.get(text[-1:])
+    if unit:
+        return float(text[:-1]) * unit
+    seconds = 0.0
+    for part in text.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def format_eta(seconds):
+    m, s = divmod(int(math.ceil(seconds)), 60)
+    h, m = divmod(m, 60)
+    return f"{h}h {m:02d}m" if h else f"{m}m {s:02d}s"
+
+
+class ThroughputStats:
+    # Real-time factor (wall seconds per media second, whole job) actually
+    # achieved on this machine, as an exponential moving average per model,
+    # device, precision and backend. Unmeasured models fall back to the
+    # priors scaled by how this machine compares on the measured ones.
+
+    def __init__(self, path=STATS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _key(self, name, backend=None):
+        from capit.registry import registry
+        return registry.key(name, backend=backend)
+
+    def record(self, name, media_seconds, wall_seconds, backend=None, task="translate"):
+        if media_seconds <= 0 or wall_seconds <= 0: return
+        rtf = wall_seconds / media_seconds / TASK_COST.get(task, 1.0)
+        key = "|".join(self._key(name, backend))
+        with self._lock:
+            # Re-read so batch workers in other processes don't overwrite each other's samples
+            data = self._read()
+            entry = data.get(key)
+            if entry:
+                entry["rtf"] = (1 - ALPHA) * entry["rtf"] + ALPHA * rtf
+                entry["samples"] += 1
+            else:
+                data[key] = {"rtf": rtf, "samples": 1}
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                tmp = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=1)
+                os.replace(tmp, self.path)
+            except OSError:
+                # Losing a sample must never fail the job that produced it
+                pass
+
+    def _prior(self, key):
+        name, device, _, backend = key
+        return PRIOR_RTF["cuda" if device.startswith("cuda") else "cpu"][name] * BACKEND_SPEED.get(backend, 1.0)
+
+    def rtf(self, name, backend=None, data=None):
+        data = self._read() if data is None else data
+        key = self._key(name, backend)
+        entry = data.get("|".join(key))
+        if entry:
+            return entry["rtf"], True
+        ratios = []
+        for k, e in data.items():
+            parts = tuple(k.split("|"))
+            if len(parts) == 4 and parts[1:] == key[1:] and parts[0] in MODEL_PRIORITY and self._prior(parts):
+                ratios.append(e["rtf"] / self._prior(parts))
+        scale = math.exp(sum(map(math.log, ratios)) / len(ratios)) if ratios else 1.0
+        return self._prior(key) * scale, False
+
+    def estimate(self, name, duration, backend=None, task="translate", data=None):
+        # Expected wall seconds to caption duration seconds of media
+        return self.rtf(name, backend, data)[0] * duration * TASK_COST.get(task, 1.0)
+
+    def choose_model(self, duration, deadline=None, models=None, backend=None, task="translate"):
+        # Largest model expected to finish within deadline seconds; without a
+        # deadline that is simply the largest one. Falls back to the fastest
+        # when none fits.
+        models = [m for m in MODEL_PRIORITY if m in (models or installed_models())]
+        if not models: return None
+        if deadline is None: return models[0]
+        data = self._read()
+        for m in models:
+            if self.estimate(m, duration, backend, task, data) <= deadline:
+                return m
+        return models[-1]
+
+    def clear(self):
+        with self._lock:
+            if os.path.exists(self.path): os.remove(self.path)
+
+
+stats = ThroughputStats()
@@ -0,0 +1,90 @@
+import numpy as np
+
+from capit import VAD_DEFAULTS as DEFAULTS
+from capit.audio import SAMPLE_RATE
+
+FRAME_SECONDS = 0.02
+
+
+def vad_options(options=None):
+    # None turns the stage off; a dict (possibly empty) overrides the defaults
+    if options is None: return None
+    return {**DEFAULTS, **{k: float(v) for k, v in options.items() if v is not None}}
+
+
+def vad_tag(options):
+    # Output with and without the pre-pass differs, so cache and checkpoint
+    # entries carry the settings
+    return "+vad({energy_db:g},{modulation_db:g},{min_pause:g},{pad:g})".format(**options)
+
+
+def _rolling_std(x, width):
+    kernel = np.ones(width) / width
+    mean = np.convolve(x, kernel, mode="same")
+    sq = np.convolve(x * x, kernel, mode="same")
+    return np.sqrt(np.maximum(sq - mean * mean, 0.0))
+
+
+def detect_speech(audio, energy_db=DEFAULTS["energy_db"], modulation_db=DEFAULTS["modulation_db"],
+                  min_pause=DEFAULTS["min_pause"], pad=DEFAULTS["pad"]):
+    # Returns [(start_sample, end_sample)] of the regions likely to hold speech
+    frame = int(FRAME_SECONDS * SAMPLE_RATE)
+    n = len(audio) // frame
+    if n == 0: return []
+    frames = audio[:n * frame].reshape(n, frame)
+    db = 10 * np.log10(np.einsum("ij,ij->i", frames, frames) / frame + 1e-10)
+    modulation = _rolling_std(np.maximum(db, energy_db - 20), int(1.0 / FRAME_SECONDS))
+    active = (db > energy_db) & (modulation >= modulation_db)
+
+    regions = []
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], active.astype(np.int8), [0]))))
+    for start, end in zip(edges[::2], edges[1::2]):
+        if regions and start - regions[-1][1] < min_pause / FRAME_SECONDS:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+
+    padding = int(pad * SAMPLE_RATE)
+    merged = []
+    for start, end in regions:
+        start, end = max(0, start * frame - padding), min(len(audio), end * frame + padding)
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], int(end))
+        else:
+            merged.append((int(start), int(end)))
+    return merged
+
+
+class Timeline:
+    # Maps times in the compacted (speech-only) audio back to the original
+    # media timeline
+
+    def __init__(self, regions, offset=0.0, total_samples=0):
+        self.compact = np.cumsum([0] + [end - start for start, end in regions])[:-1] / SAMPLE_RATE
+        self.original = np.array([start for start, _ in regions], dtype=np.float64) / SAMPLE_RATE
+        self.lengths = np.array([end - start for start, end in regions], dtype=np.float64) / SAMPLE_RATE
+        self.offset = offset
+        self.compact_total = float(self.lengths.sum())
+        self.original_total = total_samples / SAMPLE_RATE
+
+    def to_original(self, t, end=False):
+        if not len(self.compact):
+            return self.offset
+        # A time on a region boundary closes the earlier region when it is an end
+        i = max(int(np.searchsorted(self.compact, t, side="left" if end else "right")) - 1, 0)
+        return self.offset + self.original[i] + min(max(t - self.compact[i], 0.0), self.lengths[i])
+
+    def position(self, t):
+        # How far decoding got; past the last region the rest is non-speech
+        return self.offset + self.original_total if t >= self.compact_total else self.to_original(t)
+
+    def map_segments(self, segs):
+        return [{**s, "start": self.to_original(s["start"]), "end": self.to_original(s["end"], end=True)} for s in segs]
+
+
+def compact(audio, regions, offset=0.0):
+    # Returns the speech regions back to back, the timeline to map results
+    # through and the fraction of the audio that was dropped
+    kept = np.concatenate([audio[start:end] for start, end in regions]) if regions else audio[:0]
+    skipped = 1.0 - len(kept) / len(audio) if len(audio) else 0.0
+    return kept, Timeline(regions, offset, len(audio)), skipped
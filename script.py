@@ -1,14 +1,29 @@
+import time
+_STARTUP = {"start": time.perf_counter()}
+
 import os
 import sys
+import json
 import threading
-import tempfile
 import subprocess
 import shutil
 import importlib.util
 import webbrowser
+
+if __name__ == "__main__" and len(sys.argv) > 1:
+    # Headless entry point (e.g. `python script.py batch <dir>`): never touches the GUI stack
+    from capit.cli import main
+    sys.exit(main())
+
 import customtkinter as ctk
-from PIL import Image
 from tkinter import filedialog, messagebox
+from capit import MODEL_SIZES, MODEL_PRIORITY, VAD_DEFAULTS, model_path
+from capit.backends import DEFAULT_BACKEND, available_backends
+from capit.cache import cache
+from capit.registry import registry
+from capit.throughput import format_eta, parse_deadline, stats
+
+_STARTUP["imports"] = time.perf_counter()
 
 def resource_path(relative_path):
     try:
@@ -28,11 +43,23 @@ class CapIT(ctk.CTk):
         
         self.video_path = ctk.StringVar()
         self.task_choice = ctk.StringVar(value="translate")
+        self.time_ranges = ctk.StringVar()
+        self.deadline = ctk.StringVar()
+        self.media_durations = {}
+        self.eta_job = None
+        self.run_clock = None
+        self.vad_enabled = ctk.BooleanVar(value=False)
+        self.vad_settings = {k: ctk.StringVar(value=f"{VAD_DEFAULTS[k]:g}") for k in ("energy_db", "modulation_db", "min_pause")}
         self.model_choice = ctk.StringVar(value="none") 
+        self.backend_choice = ctk.StringVar(value=DEFAULT_BACKEND)
         self.is_downloading = False
+        self.engine_health = None
+        self.model_rows = {}
+        self.built_frames = set()
+        self.preload_models = os.environ.get("CAPIT_PRELOAD", "1") != "0"
 
-        self.model_sizes = {"tiny": 75, "base": 145, "small": 470, "medium": 1450, "large": 3000}
-        self.model_priority = ["large", "medium", "small", "base", "tiny"]
+        self.model_sizes = MODEL_SIZES
+        self.model_priority = MODEL_PRIORITY
 
         self.accent_blue = "#3b8ed0"
         self.accent_red = "#e74c3c"
@@ -43,6 +70,13 @@ class CapIT(ctk.CTk):
         self.setup_ui()
         self.check_system_health()
         self.auto_select_best_model()
+        for var in (self.video_path, self.deadline, self.task_choice, self.model_choice, self.backend_choice):
+            var.trace_add("write", lambda *args: self.schedule_eta())
+
+        _STARTUP["ui_built"] = time.perf_counter()
+        self.startup_report = os.environ.get("CAPIT_STARTUP_REPORT")
+        if self.startup_report:
+            self.after_idle(self._mark_first_window)
 
     def set_window_icon(self):
         try:
@@ -52,21 +86,29 @@ class CapIT(ctk.CTk):
         except: pass
 
     def get_model_path(self, model_name):
-        base_dir = os.path.join(os.path.expanduser("~"), ".cache", "whisper")
-        variations = [f"{model_name}.pt"]
-        if model_name == "large":
-            variations.extend(["large-v3.pt", "large-v2.pt", "large-v1.pt"])
-        for v in variations:
-            full_path = os.path.join(base_dir, v)
-            if os.path.exists(full_path):
-                return full_path
-        return os.path.join(base_dir, f"{model_name}.pt")
+        return model_path(model_name)
 
     def update_active_model(self, m_name):
         self.model_choice.set(m_name)
-        if hasattr(self, 'active_model_pill'):
-            display_text = m_name.upper() if m_name != "none" else "NONE (Check Settings)"
-            self.active_model_pill.configure(text=display_text, fg_color=self.accent_blue if m_name != "none" else self.accent_red)
+        self.refresh_model_pill()
+        # Warm the weights in the background so the next Start skips the load
+        if m_name != "none" and self.preload_models and (self.engine_health is None or self.engine_health[1]):
+            registry.preload(m_name, backend=self.backend_choice.get(), on_ready=lambda key: self.after(0, lambda: self.refresh_model_pill(key)))
+
+    def refresh_model_pill(self, key=None):
+        # key is the registry key of a loaded model; its precision is only known once loaded
+        if not hasattr(self, 'active_model_pill'): return
+        m_name, backend = self.model_choice.get(), self.backend_choice.get()
+        if key and (key[0], key[3]) != (m_name, backend): return
+        if m_name == "none":
+            display_text = "NONE (Check Settings)"
+        else:
+            display_text = f"{m_name.upper()} · {backend.upper()}" + (f" · {key[2].upper()}" if key else "")
+        self.active_model_pill.configure(text=display_text, fg_color=self.accent_blue if m_name != "none" else self.accent_red)
+
+    def change_backend(self, backend):
+        self.backend_choice.set(backend)
+        self.update_active_model(self.model_choice.get())
 
     def auto_select_best_model(self):
         selected = "none"
@@ -77,24 +119,78 @@ class CapIT(ctk.CTk):
         self.update_active_model(selected)
         self.refresh_settings_models()
 
-    def refresh_settings_models(self):
-        if not hasattr(self, 'model_box'): return
-        for widget in self.model_box.winfo_children(): widget.destroy()
+    def schedule_eta(self):
+        # Debounced so typing a deadline doesn't probe on every keystroke
+        if self.run_clock is not None: return
+        if self.eta_job: self.after_cancel(self.eta_job)
+        self.eta_job = self.after(400, self.refresh_eta)
+
+    def refresh_eta(self):
+        self.eta_job = None
+        path, task, backend = self.video_path.get(), self.task_choice.get(), self.backend_choice.get()
+        if not path or not os.path.isfile(path):
+            self.eta_lbl.configure(text="ETA: select a video")
+            return
+        try:
+            deadline = parse_deadline(self.deadline.get()) if self.deadline.get().strip() else None
+        except ValueError:
+            self.eta_lbl.configure(text="ETA: deadline must look like 45m, 2h or 1:30:00")
+            return
+        def probe():
+            try:
+                if path not in self.media_durations:
+                    from capit import engine
+                    self.media_durations[path] = engine.probe_duration(path)
+                duration = self.media_durations[path]
+                model = stats.choose_model(duration, deadline, backend=backend, task=task) if deadline else self.model_choice.get()
+                if model in (None, "none"):
+                    return self.after(0, lambda: self.eta_lbl.configure(text="ETA: no model installed"))
+                est, measured = stats.estimate(model, duration, backend, task), stats.rtf(model, backend)[1]
+                self.after(0, lambda: self.apply_eta(model, est, measured, deadline))
+            except Exception:
+                self.after(0, lambda: self.eta_lbl.configure(text="ETA: unavailable"))
+        threading.Thread(target=probe, daemon=True).start()
+
+    def apply_eta(self, model, est, measured, deadline):
+        if model != self.model_choice.get():
+            self.update_active_model(model)
+            self.refresh_settings_models()
+        text = f"ETA: ~{format_eta(est)} on {model.upper()}" + ("" if measured else " (estimated)")
+        if deadline is not None and est > deadline:
+            text += " · misses deadline"
+        self.eta_lbl.configure(text=text)
+
+    def build_model_rows(self):
         for m in self.model_priority:
-            path = self.get_model_path(m)
-            exists = os.path.exists(path)
-            row = ctk.CTkFrame(self.model_box, fg_color=("gray85", "gray20") if self.model_choice.get() == m else "transparent", corner_radius=12)
+            row = ctk.CTkFrame(self.model_box, fg_color="transparent", corner_radius=12)
             row.pack(fill="x", pady=3)
             ctk.CTkLabel(row, text=m.upper(), width=100, anchor="w", font=ctk.CTkFont(weight="bold")).pack(side="left", padx=15, pady=8)
-            ctk.CTkLabel(row, text="Downloaded" if exists else "Not Installed", text_color="#2ecc71" if exists else "orange", width=150, anchor="w").pack(side="left")
+            status = ctk.CTkLabel(row, text="", width=150, anchor="w")
+            status.pack(side="left")
             btn_c = ctk.CTkFrame(row, fg_color="transparent")
             btn_c.pack(side="right", padx=10)
+            self.model_rows[m] = {
+                "row": row,
+                "status": status,
+                "install": ctk.CTkButton(btn_c, text="Install", width=80, height=28, command=lambda n=m: self.download_model(n)),
+                "activate": ctk.CTkButton(btn_c, text="Activate", width=80, height=28, fg_color=self.accent_blue, command=lambda n=m: [self.update_active_model(n), self.refresh_settings_models()]),
+                "delete": ctk.CTkButton(btn_c, text="Delete", width=80, height=28, fg_color="transparent", border_width=1, border_color=self.accent_red, text_color=self.accent_red, command=lambda n=m: self.delete_model(n)),
+            }
+
+    def refresh_settings_models(self):
+        # Rows are built once with the Settings tab; this only updates them in place
+        for m, w in self.model_rows.items():
+            exists = os.path.exists(self.get_model_path(m))
+            active = self.model_choice.get() == m
+            w["row"].configure(fg_color=("gray85", "gray20") if active else "transparent")
+            w["status"].configure(text="Downloaded" if exists else "Not Installed", text_color="#2ecc71" if exists else "orange")
+            for b in ("install", "activate", "delete"): w[b].pack_forget()
             if not exists:
-                ctk.CTkButton(btn_c, text="Install", width=80, height=28, command=lambda n=m: self.download_model(n)).pack(side="left")
+                w["install"].pack(side="left")
             else:
-                if self.model_choice.get() != m:
-                    ctk.CTkButton(btn_c, text="Activate", width=80, height=28, fg_color=self.accent_blue, command=lambda n=m: [self.update_active_model(n), self.refresh_settings_models()]).pack(side="left", padx=2)
-                ctk.CTkButton(btn_c, text="Delete", width=80, height=28, fg_color="transparent", border_width=1, border_color=self.accent_red, text_color=self.accent_red, command=lambda n=m: self.delete_model(n)).pack(side="left", padx=2)
+                if not active:
+                    w["activate"].pack(side="left", padx=2)
+                w["delete"].pack(side="left", padx=2)
 
     def change_appearance_mode(self, mode):
         ctk.set_appearance_mode(mode)
@@ -111,6 +207,7 @@ class CapIT(ctk.CTk):
         self.sidebar.grid_rowconfigure(5, weight=1) 
         
         try:
+            from PIL import Image
             logo_path = resource_path(os.path.join("images", "capit-logo.png"))
             logo_img = ctk.CTkImage(Image.open(logo_path), size=(35, 35))
             self.logo_label = ctk.CTkLabel(self.sidebar, text=" CapIT", image=logo_img, compound="left", font=ctk.CTkFont(size=26, weight="bold"))
@@ -127,16 +224,17 @@ class CapIT(ctk.CTk):
 
         self.health_card = ctk.CTkFrame(self.sidebar, height=80, corner_radius=20, fg_color=("gray85", "gray14"))
         self.health_card.pack(side="bottom", padx=20, pady=40, fill="x")
-        self.health_dot = ctk.CTkLabel(self.health_card, text="● System Status", font=ctk.CTkFont(size=11))
+        self.health_dot = ctk.CTkLabel(self.health_card, text="● System Status", font=ctk.CTkFont(size=11), cursor="hand2")
         self.health_dot.pack(pady=15)
+        self.health_dot.bind("<Button-1>", lambda e: self.check_system_health())
 
         self.home_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.settings_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.credits_frame = ctk.CTkFrame(self, fg_color="transparent")
         
+        # Settings and Credits are built the first time they are shown
         self.build_home()
-        self.build_settings()
-        self.build_credits()
+        self.built_frames.add("home")
         self.show_frame("home")
 
     def build_home(self):
@@ -165,6 +263,13 @@ class CapIT(ctk.CTk):
         radio_row.pack(pady=20)
         ctk.CTkRadioButton(radio_row, text="Translate", variable=self.task_choice, value="translate").pack(side="left", padx=20)
         ctk.CTkRadioButton(radio_row, text="Transcribe", variable=self.task_choice, value="transcribe").pack(side="left", padx=20)
+        ctk.CTkRadioButton(radio_row, text="Both", variable=self.task_choice, value="both").pack(side="left", padx=20)
+        ctk.CTkEntry(s_card, textvariable=self.time_ranges, placeholder_text="Only re-caption these ranges, e.g. 12:30-14:45, 1:02:00-1:03:10 (optional)", width=480, height=36, corner_radius=18).pack(pady=(0, 10))
+        eta_row = ctk.CTkFrame(s_card, fg_color="transparent")
+        eta_row.pack(pady=(0, 20))
+        ctk.CTkEntry(eta_row, textvariable=self.deadline, placeholder_text="Deadline, e.g. 45m (optional)", width=200, height=36, corner_radius=18).pack(side="left", padx=10)
+        self.eta_lbl = ctk.CTkLabel(eta_row, text="ETA: select a video", width=270, anchor="w", text_color=("gray30", "gray70"))
+        self.eta_lbl.pack(side="left", padx=10)
 
         self.p_bar = ctk.CTkProgressBar(self.home_frame, height=12, corner_radius=6, progress_color=self.accent_blue)
         self.p_bar.set(0)
@@ -204,8 +309,36 @@ class CapIT(ctk.CTk):
         self.set_model_pbar.pack(fill="x", padx=30, pady=(5, 15))
         self.model_box = ctk.CTkFrame(m_card, fg_color="transparent")
         self.model_box.pack(fill="x", padx=20, pady=(0, 20))
+        self.build_model_rows()
         self.refresh_settings_models()
 
+        b_card = ctk.CTkFrame(scroll, corner_radius=25, border_width=1)
+        b_card.pack(pady=10, fill="x")
+        ctk.CTkLabel(b_card, text="Inference Backend", font=ctk.CTkFont(weight="bold")).pack(anchor="w", padx=30, pady=(20, 10))
+        ctk.CTkLabel(b_card, text="int8 backends trade a little accuracy for much faster CPU decoding.", text_color=("gray30", "gray70"), font=ctk.CTkFont(size=12)).pack(anchor="w", padx=30)
+        ctk.CTkOptionMenu(b_card, values=available_backends() or [DEFAULT_BACKEND], variable=self.backend_choice, width=220, height=32, corner_radius=16, command=self.change_backend).pack(anchor="w", padx=30, pady=(10, 25))
+
+        v_card = ctk.CTkFrame(scroll, corner_radius=25, border_width=1)
+        v_card.pack(pady=10, fill="x")
+        ctk.CTkLabel(v_card, text="Voice Detection", font=ctk.CTkFont(weight="bold")).pack(anchor="w", padx=30, pady=(20, 10))
+        ctk.CTkSwitch(v_card, text="Skip silence and music before decoding", variable=self.vad_enabled).pack(anchor="w", padx=30)
+        vad_row = ctk.CTkFrame(v_card, fg_color="transparent")
+        vad_row.pack(fill="x", padx=30, pady=(10, 25))
+        for key, label in [("energy_db", "Min. level (dBFS)"), ("modulation_db", "Min. variation (dB)"), ("min_pause", "Min. pause (s)")]:
+            ctk.CTkLabel(vad_row, text=label, font=ctk.CTkFont(size=12)).pack(side="left", padx=(0, 5))
+            ctk.CTkEntry(vad_row, textvariable=self.vad_settings[key], width=60, height=30, corner_radius=15).pack(side="left", padx=(0, 15))
+
+        c_card = ctk.CTkFrame(scroll, corner_radius=25, border_width=1)
+        c_card.pack(pady=10, fill="x")
+        ctk.CTkLabel(c_card, text="Transcript Cache", font=ctk.CTkFont(weight="bold")).pack(anchor="w", padx=30, pady=(20, 10))
+        self.cache_stat_lbl = ctk.CTkLabel(c_card, text="Checking...", font=ctk.CTkFont(size=12))
+        self.cache_stat_lbl.pack(padx=30, anchor="w")
+        cache_btn_row = ctk.CTkFrame(c_card, fg_color="transparent")
+        cache_btn_row.pack(fill="x", padx=30, pady=(10, 25))
+        ctk.CTkButton(cache_btn_row, text="Refresh", width=130, height=38, corner_radius=19, command=self.refresh_cache_stats).pack(side="left", padx=(0, 10))
+        ctk.CTkButton(cache_btn_row, text="Clear Cache", width=130, height=38, corner_radius=19, fg_color="transparent", border_width=1, border_color=self.accent_red, text_color=self.accent_red, command=self.clear_cache).pack(side="left")
+        self.refresh_cache_stats()
+
         d_card = ctk.CTkFrame(scroll, corner_radius=25, border_width=1)
         d_card.pack(pady=10, fill="x")
         ctk.CTkLabel(d_card, text="System Engines", font=ctk.CTkFont(weight="bold")).pack(anchor="w", padx=30, pady=15)
@@ -219,6 +352,8 @@ class CapIT(ctk.CTk):
             stat_lbl = ctk.CTkLabel(row, text="Checking...", font=ctk.CTkFont(weight="bold"))
             stat_lbl.pack(side="left", padx=10)
             setattr(self, f"{attr}_stat_lbl", stat_lbl)
+        ctk.CTkButton(d_card, text="Re-check", width=130, height=38, corner_radius=19, fg_color="transparent", border_width=1, command=self.check_system_health).pack(anchor="w", padx=30, pady=(0, 20))
+        self.apply_system_health()
 
         btn_row = ctk.CTkFrame(scroll, fg_color="transparent")
         btn_row.pack(pady=30, fill="x")
@@ -227,6 +362,18 @@ class CapIT(ctk.CTk):
         self.uninst_btn = ctk.CTkButton(btn_row, text="Uninstall Engines", height=45, corner_radius=22, fg_color="transparent", border_width=1, border_color=self.accent_red, text_color=self.accent_red, command=lambda: self.manage_deps("uninstall"))
         self.uninst_btn.pack(side="left", padx=5)
 
+    def refresh_cache_stats(self):
+        if not hasattr(self, 'cache_stat_lbl'): return
+        s = cache.stats()
+        self.cache_stat_lbl.configure(text=f"{s['entries']} transcripts · {s['bytes'] / (1024 * 1024):.1f} MB · {s['hits']} hits / {s['misses']} misses")
+
+    def clear_cache(self):
+        if messagebox.askyesno("Confirm", "Clear all cached transcripts?"):
+            try:
+                cache.clear()
+                self.refresh_cache_stats()
+            except Exception as e: messagebox.showerror("Error", str(e))
+
     def manage_deps(self, mode):
         def task():
             self.after(0, lambda: [self.repair_btn.configure(state="disabled"), self.uninst_btn.configure(state="disabled")])
@@ -250,63 +397,74 @@ class CapIT(ctk.CTk):
         threading.Thread(target=task, daemon=True).start()
 
     def download_model(self, name):
-        def monitor_file(target_path, total_size_mb):
-            parent_dir = os.path.dirname(target_path)
-            while self.is_downloading:
-                try:
-                    curr_size_mb = 0
-                    files = [os.path.join(parent_dir, f) for f in os.listdir(parent_dir) if f.endswith('.tmp') or f.startswith(name)]
-                    if files:
-                        curr_size_mb = max(os.path.getsize(f) for f in files) / (1024 * 1024)
-                    
-                    p = min(curr_size_mb / total_size_mb, 0.98)
-                    self.after(0, lambda v=p, cm=curr_size_mb, tm=total_size_mb: [
-                        self.set_model_pbar.set(v), 
-                        self.set_model_status_lbl.configure(text=f"Downloading {name.upper()}: ({int(cm)}MB / {int(tm)}MB)")
-                    ])
-                except: pass
-                threading.Event().wait(0.5)
+        def on_progress(received, total):
+            total = total or self.model_sizes[name] * 1024 * 1024
+            self.after(0, lambda r=received, t=total: [
+                self.set_model_pbar.set(min(r / t, 1.0)),
+                self.set_model_status_lbl.configure(text=f"Downloading {name.upper()}: ({r // (1024 * 1024)}MB / {t // (1024 * 1024)}MB)")
+            ])
 
         def run():
-            # Set this BEFORE starting monitor
             self.is_downloading = True
             try:
-                import whisper
-                path = self.get_model_path(name)
-                # Ensure parent directory exists for monitor
-                os.makedirs(os.path.dirname(path), exist_ok=True)
-                threading.Thread(target=monitor_file, args=(path, self.model_sizes[name]), daemon=True).start()
-                whisper.load_model(name)
-                self.after(0, lambda: [self.set_model_pbar.set(1), self.update_active_model(name), self.refresh_settings_models()])
+                from capit.downloader import download_model
+                download_model(name, progress=on_progress)
+                self.after(0, lambda: [self.set_model_status_lbl.configure(text=f"Verified {name.upper()}"), self.update_active_model(name), self.refresh_settings_models()])
             except Exception as e:
-                self.after(0, lambda: messagebox.showerror("Error", str(e)))
+                self.after(0, lambda msg=str(e): messagebox.showerror("Error", msg))
             finally:
                 self.is_downloading = False
-                self.after(0, lambda: [self.set_model_status_lbl.configure(text="Ready"), self.set_model_pbar.set(0)])
+                self.after(1000, lambda: [self.set_model_status_lbl.configure(text="Ready"), self.set_model_pbar.set(0)])
 
         threading.Thread(target=run, daemon=True).start()
 
     def check_system_health(self):
-        ff_ok = shutil.which("ffmpeg") is not None
-        wh_ok = importlib.util.find_spec("whisper") is not None
-        self.after(0, lambda: [
-            self.ff_stat_lbl.configure(text="Active" if ff_ok else "Missing", text_color="green" if ff_ok else self.accent_red),
-            self.wh_stat_lbl.configure(text="Active" if wh_ok else "Missing", text_color="green" if wh_ok else self.accent_red),
-            self.py_stat_lbl.configure(text="Active", text_color="green"),
-            self.health_dot.configure(text="🟢 Engine Ready" if (ff_ok and wh_ok) else "🔴 Engine Missing", text_color="green" if (ff_ok and wh_ok) else self.accent_red)
-        ])
-        if not hasattr(self, "_health_loop_active"):
-            self._health_loop_active = True
-            self._run_health_loop()
-
-    def _run_health_loop(self):
-        self.check_system_health()
-        self.after(3000, self._run_health_loop)
+        # Probed off the UI thread, and only at startup, after engine changes or on request
+        def probe():
+            importlib.invalidate_caches()
+            health = (shutil.which("ffmpeg") is not None, importlib.util.find_spec("whisper") is not None)
+            self.after(0, lambda: [setattr(self, "engine_health", health), self.apply_system_health()])
+        self.health_dot.configure(text="● Checking...", text_color=("gray10", "gray90"))
+        threading.Thread(target=probe, daemon=True).start()
+
+    def apply_system_health(self):
+        if self.engine_health is None: return
+        ff_ok, wh_ok = self.engine_health
+        self.health_dot.configure(text="🟢 Engine Ready" if (ff_ok and wh_ok) else "🔴 Engine Missing", text_color="green" if (ff_ok and wh_ok) else self.accent_red)
+        if not hasattr(self, "ff_stat_lbl"): return
+        self.ff_stat_lbl.configure(text="Active" if ff_ok else "Missing", text_color="green" if ff_ok else self.accent_red)
+        self.wh_stat_lbl.configure(text="Active" if wh_ok else "Missing", text_color="green" if wh_ok else self.accent_red)
+        self.py_stat_lbl.configure(text="Active", text_color="green")
+
+    def _mark_first_window(self):
+        _STARTUP["first_window"] = time.perf_counter()
+        # Give background start-up work a moment to settle, then sample idle CPU
+        self.after(2000, lambda: self._sample_idle_cpu(time.process_time(), time.perf_counter(), 10.0))
+
+    def _sample_idle_cpu(self, cpu0, wall0, seconds):
+        if time.perf_counter() - wall0 < seconds:
+            self.after(500, lambda: self._sample_idle_cpu(cpu0, wall0, seconds))
+            return
+        t0 = _STARTUP["start"]
+        report = {
+            "version": self.version,
+            "imports_ms": round((_STARTUP["imports"] - t0) * 1000, 1),
+            "ui_built_ms": round((_STARTUP["ui_built"] - t0) * 1000, 1),
+            "first_window_ms": round((_STARTUP["first_window"] - t0) * 1000, 1),
+            "idle_cpu_pct": round(100 * (time.process_time() - cpu0) / (time.perf_counter() - wall0), 2),
+            "preload": self.preload_models,
+        }
+        if self.startup_report == "1":
+            print(json.dumps(report))
+        else:
+            with open(self.startup_report, "a", encoding="utf-8") as f:
+                f.write(json.dumps(report) + "\n")
 
     def delete_model(self, name):
         if messagebox.askyesno("Confirm", f"Delete {name} model?"):
             try: 
                 os.remove(self.get_model_path(name))
+                registry.discard(name)
                 self.auto_select_best_model()
                 self.refresh_settings_models()
             except Exception as e: messagebox.showerror("Error", str(e))
@@ -316,36 +474,55 @@ class CapIT(ctk.CTk):
             messagebox.showwarning("Warning", "Configuration incomplete.")
             return
         self.start_btn.configure(state="disabled")
+        self.run_clock = None
         threading.Thread(target=self.process_engine, daemon=True).start()
 
+    def report_progress(self, status, value):
+        if status: self.after(0, lambda: self.status_lbl.configure(text=status))
+        if value is not None:
+            self.after(0, lambda: self.p_bar.set(value))
+            self.update_run_eta(value)
+
+    def update_run_eta(self, value):
+        # Remaining time from the decode rate so far; progress reaches 0.3 once the model is loaded
+        now = time.perf_counter()
+        if value < 0.3: return
+        if self.run_clock is None:
+            self.run_clock = (now, value)
+            return
+        t0, v0 = self.run_clock
+        if value - v0 >= 0.01:
+            remaining = (now - t0) * (1.0 - value) / (value - v0)
+            self.after(0, lambda: self.eta_lbl.configure(text=f"Remaining: ~{format_eta(remaining)}"))
+
     def process_engine(self):
-        temp_path = os.path.join(tempfile.gettempdir(), "capit_audio.wav")
         try:
-            import whisper, ffmpeg
-            from whisper.utils import format_timestamp
-            self.after(0, lambda: [self.status_lbl.configure(text="Extracting Audio..."), self.p_bar.set(0.10)])
-            ffmpeg.input(self.video_path.get()).output(temp_path, acodec="pcm_s16le", ac=1, ar="16000").overwrite_output().run(quiet=True)
-            self.after(0, lambda: [self.status_lbl.configure(text="Loading AI Model..."), self.p_bar.set(0.25)])
-            model = whisper.load_model(self.model_choice.get())
-            self.after(0, lambda: self.status_lbl.configure(text="AI Processing..."))
-            probe = ffmpeg.probe(self.video_path.get())
-            total_duration = float(probe['format']['duration'])
-            result = model.transcribe(temp_path, task=self.task_choice.get())
-            out_file = os.path.splitext(self.video_path.get())[0] + ".srt"
-            with open(out_file, "w", encoding="utf-8") as f:
-                for i, seg in enumerate(result["segments"], 1):
-                    progress = 0.3 + (0.7 * (seg['end'] / total_duration))
-                    self.after(0, lambda v=progress: self.p_bar.set(v))
-                    f.write(f"{i}\n{format_timestamp(seg['start'])} --> {format_timestamp(seg['end'])}\n{seg['text'].strip()}\n\n")
+            from capit import engine
+            if self.time_ranges.get().strip():
+                from capit.recaption import parse_ranges, recaption
+                ranges = parse_ranges(self.time_ranges.get())
+                result = recaption(self.video_path.get(), ranges, self.model_choice.get(), self.task_choice.get(), progress=self.report_progress, backend=self.backend_choice.get())
+            else:
+                vad = {k: float(v.get()) for k, v in self.vad_settings.items()} if self.vad_enabled.get() else None
+                result = engine.transcribe_file(self.video_path.get(), self.model_choice.get(), self.task_choice.get(), progress=self.report_progress, backend=self.backend_choice.get(), vad=vad)
             self.after(0, lambda: [self.p_bar.set(1.0), self.status_lbl.configure(text="Complete!")])
-            messagebox.showinfo("Done", f"Captions saved to: {out_file}")
+            saved = "\n".join(result.get("outputs", [result["srt"]]))
+            if result.get("vad_skipped") is not None:
+                saved += f"\n\nVoice detection skipped {result['vad_skipped']:.0%} of the audio."
+            messagebox.showinfo("Done", f"Captions saved to: {saved}")
         except Exception as e: 
             self.after(0, lambda: messagebox.showerror("Error", str(e)))
         finally: 
-            if os.path.exists(temp_path): os.remove(temp_path)
-            self.after(1000, lambda: [self.p_bar.set(0), self.status_lbl.configure(text="System Idle"), self.start_btn.configure(state="normal")])
+            self.after(1000, lambda: [self.p_bar.set(0), self.status_lbl.configure(text="System Idle"), self.start_btn.configure(state="normal"), self.refresh_cache_stats(), self.finish_run_eta()])
+
+    def finish_run_eta(self):
+        self.run_clock = None
+        self.schedule_eta()
 
     def show_frame(self, name):
+        if name not in self.built_frames:
+            {"settings": self.build_settings, "credits": self.build_credits}[name]()
+            self.built_frames.add(name)
         frames = {"home": self.home_frame, "settings": self.settings_frame, "credits": self.credits_frame}
         buttons = {"home": self.home_btn, "settings": self.settings_btn, "credits": self.credits_btn}
         for f_name, frame in frames.items():
@@ -0,0 +1,119 @@
+import os
+import hashlib
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from capit.downloader import ChecksumError, Downloader
+
+PAYLOAD = os.urandom(3 * 1024 * 1024 + 123)
+SHA256 = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    # Serves PAYLOAD with Range support; the server's flags switch off HEAD
+    # or cut the next response short
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        if not self.server.head:
+            self.send_error(405)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+    def do_GET(self):
+        self.server.requests.append(self.headers.get("Range"))
+        start, end = 0, len(PAYLOAD) - 1
+        ranged = self.headers.get("Range")
+        if ranged:
+            first, _, last = ranged.split("=")[1].partition("-")
+            start, end = int(first), int(last) if last else len(PAYLOAD) - 1
+            if start >= len(PAYLOAD):
+                self.send_error(416)
+                return
+        body = PAYLOAD[start:end + 1]
+        self.send_response(206 if ranged else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        if self.server.drop_next:
+            self.server.drop_next = False
+            body = body[:len(body) // 2]
+        self.wfile.write(body)
+
+
+class DownloaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+        self.httpd.head, self.httpd.drop_next, self.httpd.requests = True, False, []
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/model.pt"
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.tmp.name, "model.pt")
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.tmp.cleanup()
+
+    def read_dest(self):
+        with open(self.dest, "rb") as f:
+            return f.read()
+
+    def test_single_segment(self):
+        seen = []
+        Downloader(self.url, self.dest, SHA256, progress=lambda got, total: seen.append((got, total)), min_interval=0).run()
+        self.assertEqual(self.read_dest(), PAYLOAD)
+        self.assertEqual(seen[-1], (len(PAYLOAD), len(PAYLOAD)))
+        self.assertFalse(os.path.exists(self.dest + ".part"))
+
+    def test_parallel_segments(self):
+        Downloader(self.url, self.dest, SHA256, segments=4).run()
+        self.assertEqual(self.read_dest(), PAYLOAD)
+        self.assertEqual(len([r for r in self.httpd.requests if r]), 4)
+
+    def test_resumes_partial_file(self):
+        with open(self.dest + ".part", "wb") as f:
+            f.write(PAYLOAD[:1000])
+        Downloader(self.url, self.dest, SHA256).run()
+        self.assertEqual(self.read_dest(), PAYLOAD)
+        self.assertEqual(self.httpd.requests, ["bytes=1000-"])
+
+    def test_resumes_dropped_connection(self):
+        self.httpd.drop_next = True
+        Downloader(self.url, self.dest, SHA256).run()
+        self.assertEqual(self.read_dest(), PAYLOAD)
+        self.assertEqual(len(self.httpd.requests), 2)
+
+    def test_complete_part_is_verified_without_refetching(self):
+        # Crash between the last byte and the rename
+        with open(self.dest + ".part", "wb") as f:
+            f.write(PAYLOAD)
+        Downloader(self.url, self.dest, SHA256).run()
+        self.assertEqual(self.read_dest(), PAYLOAD)
+        self.assertEqual(self.httpd.requests, [])
+
+    def test_complete_part_without_head(self):
+        # Unknown size: the server answers the resume request with 416
+        self.httpd.head = False
+        with open(self.dest + ".part", "wb") as f:
+            f.write(PAYLOAD)
+        Downloader(self.url, self.dest, SHA256).run()
+        self.assertEqual(self.read_dest(), PAYLOAD)
+
+    def test_checksum_mismatch(self):
+        with self.assertRaises(ChecksumError):
+            Downloader(self.url, self.dest, "0" * 64).run()
+        self.assertFalse(os.path.exists(self.dest))
+        self.assertFalse(os.path.exists(self.dest + ".part"))
+
+
+if __name__ == "__main__":
+    unittest.main()